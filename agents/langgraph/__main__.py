@@ -1,8 +1,17 @@
-from common.server import A2AServer
+from common.server import A2AServer, SqliteTaskStore, TaskRetentionPolicy
+from common.server.scheduler import ExecutionScheduler
 from common.types import AgentCard, AgentCapabilities, AgentSkill, MissingAPIKeyError
 from common.utils.push_notification_auth import PushNotificationSenderAuth
 from agents.langgraph.task_manager import AgentTaskManager
-from agents.langgraph.agent import CurrencyAgent
+from agents.langgraph.agent import CurrencyAgent, exchange_rates
+from agents.langgraph.checkpoints import (
+    CheckpointRetentionPolicy,
+    MemoryCheckpointStore,
+    SqliteCheckpointStore,
+)
+from agents.langgraph.history import HistoryPolicy
+from agents.langgraph.models import MODEL_PROVIDERS, create_chat_model
+from agents.langgraph.response_cache import ResponseCache
 import click
 import os
 import logging
@@ -16,10 +25,58 @@ logger = logging.getLogger(__name__)
 @click.command()
 @click.option("--host", "host", default="localhost")
 @click.option("--port", "port", default=10000)
-def main(host, port):
+@click.option("--task-store", "task_store_path", default=None)
+@click.option("--task-ttl", "task_ttl", type=float, default=None)
+@click.option("--max-tasks", "max_tasks", type=int, default=None)
+@click.option("--max-task-bytes", "max_task_bytes", type=int, default=None)
+@click.option("--max-concurrency", "max_concurrency", default=8)
+@click.option("--max-queue", "max_queue", default=64)
+@click.option("--stream-tokens", "stream_tokens", is_flag=True, default=False)
+@click.option("--checkpoint-store", "checkpoint_store_path", default=None)
+@click.option("--session-ttl", "session_ttl", type=float, default=None)
+@click.option("--max-sessions", "max_sessions", type=int, default=None)
+@click.option("--max-checkpoints-per-session", "max_checkpoints", default=10)
+@click.option("--history-turns", "history_turns", type=int, default=None)
+@click.option("--history-tokens", "history_tokens", type=int, default=None)
+@click.option("--summarize-history", "summarize_history", is_flag=True, default=False)
+@click.option("--response-cache", "use_response_cache", is_flag=True, default=False)
+@click.option("--response-cache-size", "response_cache_size", default=1024)
+@click.option(
+    "--model-provider",
+    "model_provider",
+    type=click.Choice(MODEL_PROVIDERS),
+    default="google",
+)
+@click.option("--fake-latency", "fake_latency", default=0.5)
+@click.option("--fake-tokens-per-second", "fake_tokens_per_second", default=50.0)
+@click.option("--fake-tool-calls", "fake_tool_calls", default="calculate_math")
+def main(
+    host,
+    port,
+    task_store_path,
+    task_ttl,
+    max_tasks,
+    max_task_bytes,
+    max_concurrency,
+    max_queue,
+    stream_tokens,
+    checkpoint_store_path,
+    session_ttl,
+    max_sessions,
+    max_checkpoints,
+    history_turns,
+    history_tokens,
+    summarize_history,
+    use_response_cache,
+    response_cache_size,
+    model_provider,
+    fake_latency,
+    fake_tokens_per_second,
+    fake_tool_calls,
+):
     """Starts the Currency Agent server."""
     try:
-        if not os.getenv("GOOGLE_API_KEY"):
+        if model_provider == "google" and not os.getenv("GOOGLE_API_KEY"):
             raise MissingAPIKeyError("GOOGLE_API_KEY environment variable not set.")
 
         capabilities = AgentCapabilities(streaming=True, pushNotifications=True)
@@ -43,9 +100,64 @@ def main(host, port):
 
         notification_sender_auth = PushNotificationSenderAuth()
         notification_sender_auth.generate_jwk()
+        # Tasks are kept in memory unless an SQLite database path is given.
+        task_store = SqliteTaskStore(task_store_path) if task_store_path else None
+        # Finished tasks are kept forever unless a retention limit is given.
+        retention_policy = (
+            TaskRetentionPolicy(ttl=task_ttl, max_tasks=max_tasks, max_bytes=max_task_bytes)
+            if task_ttl is not None or max_tasks is not None or max_task_bytes is not None
+            else None
+        )
+        # Conversation state likewise, with its own database path.
+        checkpoint_policy = CheckpointRetentionPolicy(
+            ttl=session_ttl,
+            max_sessions=max_sessions,
+            max_checkpoints_per_thread=max_checkpoints,
+        )
+        checkpoints = (
+            SqliteCheckpointStore(checkpoint_store_path, checkpoint_policy)
+            if checkpoint_store_path
+            else MemoryCheckpointStore(checkpoint_policy)
+        )
+        # The fake provider runs offline, e.g. for load tests.
+        model = create_chat_model(
+            model_provider,
+            latency=fake_latency,
+            tokens_per_second=fake_tokens_per_second,
+            tool_calls=[name for name in fake_tool_calls.split(",") if name],
+        )
+        history_policy = (
+            HistoryPolicy(
+                max_turns=history_turns,
+                max_tokens=history_tokens,
+                summarize=summarize_history,
+            )
+            if history_turns is not None or history_tokens is not None
+            else None
+        )
         server = A2AServer(
             agent_card=agent_card,
-            task_manager=AgentTaskManager(agent=CurrencyAgent(), notification_sender_auth=notification_sender_auth),
+            task_manager=AgentTaskManager(
+                agent=CurrencyAgent(
+                    model=model,
+                    stream_tokens=stream_tokens,
+                    checkpoints=checkpoints,
+                    history_policy=history_policy,
+                    # Answers are cached as long as "latest" rates are, so
+                    # they reflect rates at most twice that old.
+                    response_cache=ResponseCache(
+                        ttl=exchange_rates.latest_ttl, max_entries=response_cache_size
+                    )
+                    if use_response_cache
+                    else None,
+                ),
+                notification_sender_auth=notification_sender_auth,
+                task_store=task_store,
+                retention_policy=retention_policy,
+                scheduler=ExecutionScheduler(
+                    max_concurrency=max_concurrency, max_queue_size=max_queue
+                ),
+            ),
             host=host,
             port=port,
         )
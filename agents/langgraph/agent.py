@@ -1,13 +1,37 @@
-from langchain_google_genai import ChatGoogleGenerativeAI
+from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_core.tools import tool
 from langgraph.prebuilt import create_react_agent
-from langgraph.checkpoint.memory import MemorySaver
-from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.messages import (
+    AIMessage,
+    AIMessageChunk,
+    HumanMessage,
+    RemoveMessage,
+    ToolMessage,
+)
+from agents.langgraph.checkpoints import CheckpointStore, MemoryCheckpointStore
+from agents.langgraph.exchange_rates import ExchangeRateClient
+from agents.langgraph.history import (
+    HistoryPolicy,
+    PromptSizeLogger,
+    is_summary,
+    message_text,
+    select_history,
+    summary_message,
+    summary_request,
+)
+from agents.langgraph.models import create_chat_model
+from agents.langgraph.response_cache import ResponseCache
+from agents.langgraph.safe_math import EvaluationError, SafeMathEvaluator
+import asyncio
 import httpx
+import logging
 from typing import Any, Dict, AsyncIterable, Literal
 from pydantic import BaseModel
 
-memory = MemorySaver()
+logger = logging.getLogger(__name__)
+
+exchange_rates = ExchangeRateClient()
+math_evaluator = SafeMathEvaluator()
 
 @tool
 def get_exchange_rate(
@@ -26,20 +50,36 @@ def get_exchange_rate(
         A dictionary containing the exchange rate data, or an error message if the request fails.
     """    
     try:
-        response = httpx.get(
-            f"https://api.frankfurter.app/{currency_date}",
-            params={"from": currency_from, "to": currency_to},
-        )
-        response.raise_for_status()
+        return exchange_rates.get_rates(currency_from, currency_to, currency_date)
+    except httpx.HTTPError as e:
+        return {"error": f"API request failed: {e}"}
+    except ValueError as e:
+        return {"error": f"Invalid response from API: {e}"}
+
+@tool
+def get_exchange_rates(
+    currency_from: str = "USD",
+    currencies_to: list[str] | None = None,
+    currency_date: str = "latest",
+):
+    """Use this to get exchange rates from one currency to several currencies at once.
 
-        data = response.json()
-        if "rates" not in data:
-            return {"error": "Invalid API response format."}
-        return data
+    Args:
+        currency_from: The currency to convert from (e.g., "USD").
+        currencies_to: The currencies to convert to (e.g., ["EUR", "GBP"]). Defaults to ["EUR"].
+        currency_date: The date for the exchange rates or "latest". Defaults to "latest".
+
+    Returns:
+        A dictionary containing the exchange rate data, or an error message if the request fails.
+    """
+    if currencies_to is None:
+        currencies_to = ["EUR"]
+    try:
+        return exchange_rates.get_rates(currency_from, currencies_to, currency_date)
     except httpx.HTTPError as e:
         return {"error": f"API request failed: {e}"}
-    except ValueError:
-        return {"error": "Invalid JSON response from API."}
+    except ValueError as e:
+        return {"error": f"Invalid response from API: {e}"}
 
 @tool
 def calculate_math(
@@ -53,15 +93,28 @@ def calculate_math(
     Returns:
         The result of the calculation as a string, or an error message if the expression is invalid.
     """
+    return _calculate(expression)
+
+@tool
+def calculate_math_batch(
+    expressions: list[str]
+):
+    """Use this to perform several mathematical calculations at once.
+
+    Args:
+        expressions: A list of mathematical expressions (e.g., ["2 + 3", "5 * 4"]).
+
+    Returns:
+        A list with the result or error message of each expression, in order.
+    """
+    return [_calculate(expression) for expression in expressions]
+
+def _calculate(expression: str) -> dict:
     try:
-        # Basic safety check to prevent dangerous inputs
-        allowed_chars = set("0123456789 +-*/(). ")
-        if not all(c in allowed_chars for c in expression):
-            return {"error": "Invalid characters in expression. Use numbers, +, -, *, /, (), and spaces only."}
-        result = eval(expression, {"__builtins__": {}})
+        result = math_evaluator.evaluate(expression)
         return {"result": str(result)}
-    except Exception as e:
-        return {"error": f"Calculation failed: {str(e)}"}
+    except EvaluationError as e:
+        return {"error": f"Calculation failed: {e}"}
 
 class ResponseFormat(BaseModel):
     """Respond to the user in this format."""
@@ -74,12 +127,15 @@ class CurrencyAgent:
         "You are a specialized assistant for currency conversions and mathematical calculations. "
         "Your purpose is to: "
         "1. Use the 'get_exchange_rate' tool to answer questions about currency exchange rates. "
+        "When several currencies are converted from the same currency, use the 'get_exchange_rates' tool once instead. "
         "2. Use the 'calculate_math' tool to perform mathematical calculations when asked to compute expressions like '2 + 3' or '5 * 4'. "
+        "When several expressions need to be computed, use the 'calculate_math_batch' tool once instead. "
         "If the user asks about anything other than currency conversion, exchange rates, or mathematical calculations, "
         "politely state that you cannot help with that topic and can only assist with currency-related queries or math. "
         "Do not attempt to answer unrelated questions or use tools for other purposes. "
         "Examples: "
         "- Query: 'How much is 1 USD to EUR?' -> Use get_exchange_rate. "
+        "- Query: 'Convert 1 USD to EUR, GBP and JPY' -> Use get_exchange_rates. "
         "- Query: 'Calculate 2 + 3' -> Use calculate_math to return '5'. "
         "- Query: 'What's the weather?' -> Respond: 'I can only assist with currency conversions and mathematical calculations.' "
         "Set response status to input_required if the user needs to provide more information (e.g., missing currency or incomplete math expression). "
@@ -87,24 +143,81 @@ class CurrencyAgent:
         "Set response status to completed if the request is complete."
     )
      
-    def __init__(self):
-        self.model = ChatGoogleGenerativeAI(model="gemini-2.0-flash")
-        self.tools = [get_exchange_rate, calculate_math]
+    def __init__(
+        self,
+        stream_tokens: bool = False,
+        checkpoints: CheckpointStore | None = None,
+        history_policy: HistoryPolicy | None = None,
+        response_cache: ResponseCache | None = None,
+        model: BaseChatModel | None = None,
+    ):
+        # When set, stream() also forwards the model's answer as it is generated.
+        self.stream_tokens = stream_tokens
+        self.checkpoints = checkpoints or MemoryCheckpointStore()
+        self.history_policy = history_policy
+        self.response_cache = response_cache
+        self.model = model or create_chat_model("google")
+        self.tools = [get_exchange_rate, get_exchange_rates, calculate_math, calculate_math_batch]
+        # End-of-turn work (history compaction, checkpoint pruning) that runs
+        # after the response is returned, by session id.
+        self._pending_turn_ends: dict[str, asyncio.Task] = {}
+        # Built by open(), once the checkpointer is ready.
+        self.graph = None
 
-        self.graph = create_react_agent(
-            self.model, tools=self.tools, checkpointer=memory, prompt=self.SYSTEM_INSTRUCTION, response_format=ResponseFormat
-        )
+    async def open(self):
+        """Opens the checkpoint store and builds the graph, if not done yet.
+
+        Runs on the event loop that serves the agent: the server calls it
+        at startup, and the first turn does otherwise.
+        """
+        if self.graph is not None:
+            return
+        await self.checkpoints.open()
+        if self.graph is None:
+            self.graph = create_react_agent(
+                self.model, tools=self.tools, checkpointer=self.checkpoints.saver, prompt=self.SYSTEM_INSTRUCTION, response_format=ResponseFormat
+            )
+
+    async def close(self):
+        """Waits for pending end-of-turn work, then closes the checkpoint store."""
+        await asyncio.gather(*self._pending_turn_ends.values(), return_exceptions=True)
+        self.graph = None
+        await self.checkpoints.close()
 
-    def invoke(self, query, sessionId) -> str:
-        config = {"configurable": {"thread_id": sessionId}}
-        self.graph.invoke({"messages": [("user", query)]}, config)        
-        return self.get_agent_response(config)
+    async def invoke(self, query, sessionId, use_cache: bool = True) -> Dict[str, Any]:
+        await self.open()
+        await self._wait_for_turn_end(sessionId)
+        config = self._get_config(sessionId)
+        cache_key = await self._get_cache_key(query, config, use_cache)
+        if not await self._replay_cached_response(cache_key, query, config):
+            await self.graph.ainvoke({"messages": [("user", query)]}, config)
+            await self._cache_response(cache_key, config)
+        return await self._finish_turn(config)
 
-    async def stream(self, query, sessionId) -> AsyncIterable[Dict[str, Any]]:
+    async def stream(self, query, sessionId, use_cache: bool = True) -> AsyncIterable[Dict[str, Any]]:
+        await self.open()
+        await self._wait_for_turn_end(sessionId)
         inputs = {"messages": [("user", query)]}
-        config = {"configurable": {"thread_id": sessionId}}
+        config = self._get_config(sessionId)
+        cache_key = await self._get_cache_key(query, config, use_cache)
+        if await self._replay_cached_response(cache_key, query, config):
+            yield await self._finish_turn(config)
+            return
+
+        stream_mode = ["values", "messages"] if self.stream_tokens else ["values"]
+        async for mode, item in self.graph.astream(inputs, config, stream_mode=stream_mode):
+            if mode == "messages":
+                chunk, metadata = item
+                text = self._get_answer_text(chunk, metadata)
+                if text:
+                    yield {
+                        "is_task_complete": False,
+                        "require_user_input": False,
+                        "content": text,
+                        "is_chunk": True,
+                    }
+                continue
 
-        for item in self.graph.stream(inputs, config, stream_mode="values"):
             message = item["messages"][-1]
             if (
                 isinstance(message, AIMessage)
@@ -112,13 +225,13 @@ class CurrencyAgent:
                 and len(message.tool_calls) > 0
             ):
                 tool_name = message.tool_calls[0]["name"]
-                if tool_name == "get_exchange_rate":
+                if tool_name in ("get_exchange_rate", "get_exchange_rates"):
                     yield {
                         "is_task_complete": False,
                         "require_user_input": False,
                         "content": "Looking up the exchange rates...",
                     }
-                elif tool_name == "calculate_math":
+                elif tool_name in ("calculate_math", "calculate_math_batch"):
                     yield {
                         "is_task_complete": False,
                         "require_user_input": False,
@@ -131,11 +244,152 @@ class CurrencyAgent:
                     "content": "Processing the results...",
                 }            
         
-        yield self.get_agent_response(config)
+        await self._cache_response(cache_key, config)
+        yield await self._finish_turn(config)
+
+    def _get_config(self, sessionId) -> Dict[str, Any]:
+        return {
+            "configurable": {"thread_id": sessionId},
+            "callbacks": [PromptSizeLogger(sessionId)],
+        }
+
+    async def _get_cache_key(self, query, config, use_cache: bool) -> str | None:
+        """Returns the response cache key, or None if the query can't be cached.
+
+        Only the opening question of a session is cached.
+        """
+        if self.response_cache is None or not use_cache:
+            return None
+        state = await self.graph.aget_state(config)
+        if state.values.get("messages"):
+            return None
+        context = self.SYSTEM_INSTRUCTION + ",".join(tool.name for tool in self.tools)
+        return self.response_cache.key(query, context)
+
+    async def _replay_cached_response(self, cache_key, query, config) -> bool:
+        """Records a cached answer as the session's first turn, if there is one."""
+        if cache_key is None:
+            return False
+        structured_response = self.response_cache.get(cache_key)
+        if structured_response is None:
+            return False
+
+        await self.graph.aupdate_state(
+            config,
+            {
+                "messages": [
+                    HumanMessage(content=query),
+                    AIMessage(content=structured_response.message),
+                ],
+                "structured_response": structured_response,
+            },
+            as_node="generate_structured_response",
+        )
+        return True
+
+    async def _cache_response(self, cache_key, config):
+        if cache_key is None:
+            return
+        state = await self.graph.aget_state(config)
+        structured_response = state.values.get("structured_response")
+        if (
+            isinstance(structured_response, ResponseFormat)
+            and structured_response.status == "completed"
+        ):
+            self.response_cache.set(cache_key, structured_response)
+
+    async def _finish_turn(self, config) -> Dict[str, Any]:
+        response = await self.get_agent_response(config)
+        # Compacting may call the model to summarize, so it runs after the
+        # response is returned; the session's next turn waits for it.
+        session_id = config["configurable"]["thread_id"]
+        turn_end = asyncio.create_task(self._end_turn(config))
+        self._pending_turn_ends[session_id] = turn_end
+
+        def forget(_):
+            if self._pending_turn_ends.get(session_id) is turn_end:
+                del self._pending_turn_ends[session_id]
+
+        turn_end.add_done_callback(forget)
+        return response
+
+    async def _wait_for_turn_end(self, session_id):
+        turn_end = self._pending_turn_ends.get(session_id)
+        if turn_end is not None:
+            await asyncio.shield(turn_end)
+
+    async def _end_turn(self, config):
+        try:
+            if self.history_policy is not None:
+                await self._compact_history(config)
+            await self.checkpoints.end_turn(config["configurable"]["thread_id"])
+        except Exception as e:
+            logger.error(
+                f"Error while ending the turn of session {config['configurable']['thread_id']}: {e}"
+            )
+
+    async def _compact_history(self, config):
+        """Applies the history policy to the stored conversation.
+
+        Runs after each turn, so the next turn starts from the compacted
+        history and the checkpoint stays small.
+        """
+        state = await self.graph.aget_state(config)
+        messages = state.values.get("messages", [])
+        cut, kept = select_history(messages, self.history_policy)
+        if not cut:
+            return
+
+        summarize = self.history_policy.summarize
+        updates = [
+            RemoveMessage(id=message.id)
+            for message in cut
+            if not (summarize and is_summary(message))
+        ]
+        if summarize:
+            response = await self.model.ainvoke(summary_request(cut))
+            summary = summary_message(message_text(response))
+            if is_summary(cut[0]):
+                # Replaces the previous summary in place, at the start.
+                updates.append(summary)
+            else:
+                # New messages are appended, so the kept messages are re-added
+                # after the summary.
+                updates += [RemoveMessage(id=message.id) for message in kept]
+                updates.append(summary)
+                updates += [message.model_copy(update={"id": None}) for message in kept]
+
+        await self.graph.aupdate_state(
+            config, {"messages": updates}, as_node="generate_structured_response"
+        )
+        logger.info(
+            f"Compacted history of session {config['configurable']['thread_id']}: "
+            f"{len(cut)} messages {'summarized' if summarize else 'dropped'}, "
+            f"{len(kept)} kept"
+        )
+
+    def _get_answer_text(self, chunk, metadata) -> str:
+        """Returns the answer text carried by a streamed model chunk, if any.
+
+        Only the ReAct agent node's prose counts: tool call arguments and the
+        structured response call are not part of the answer.
+        """
+        if (
+            metadata.get("langgraph_node") != "agent"
+            or not isinstance(chunk, AIMessageChunk)
+            or chunk.tool_call_chunks
+        ):
+            return ""
+        if isinstance(chunk.content, str):
+            return chunk.content
+        return "".join(
+            part if isinstance(part, str) else part.get("text", "")
+            for part in chunk.content
+        )
 
         
-    def get_agent_response(self, config):
-        current_state = self.graph.get_state(config)        
+    async def get_agent_response(self, config):
+        current_state = await self.graph.aget_state(config)
         structured_response = current_state.values.get('structured_response')
         if structured_response and isinstance(structured_response, ResponseFormat): 
             if structured_response.status == "input_required":
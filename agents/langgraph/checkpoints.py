@@ -0,0 +1,259 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.memory import MemorySaver
+from pydantic import BaseModel
+import asyncio
+import logging
+import time
+
+try:
+    import aiosqlite
+    from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+except ImportError:  # SQLite checkpoints need the "sqlite" extra
+    aiosqlite = None
+    AsyncSqliteSaver = None
+
+logger = logging.getLogger(__name__)
+
+
+class CheckpointRetentionPolicy(BaseModel):
+    """Limits on the conversation state kept by the agent's checkpointer.
+
+    `ttl` is measured in seconds from the end of a session's latest turn,
+    `max_sessions` caps the number of sessions kept (least recently used are
+    evicted first) and `max_checkpoints_per_thread` caps the checkpoints kept
+    per session; only the latest one is needed to continue a conversation.
+    A limit set to None is not enforced.
+    """
+
+    ttl: float | None = None
+    max_sessions: int | None = None
+    max_checkpoints_per_thread: int | None = None
+    sweep_interval: float = 60.0
+
+
+class CheckpointStore(ABC):
+    """A LangGraph checkpointer together with the retention of its sessions.
+
+    `saver` is handed to the graph once `open` has returned; stores that
+    connect to a database create it there, on the event loop that uses it.
+    The agent calls `end_turn` after each turn, which records the session's activity, prunes the session's old
+    checkpoints and, at most once per sweep interval, evicts sessions that
+    are expired or over the session limit.
+    """
+
+    def __init__(
+        self, saver: BaseCheckpointSaver | None, policy: CheckpointRetentionPolicy | None
+    ):
+        self.saver = saver
+        self.policy = policy or CheckpointRetentionPolicy()
+        self._last_sweep = time.monotonic()
+
+    async def end_turn(self, thread_id: str):
+        await self._record_activity(thread_id)
+        if self.policy.max_checkpoints_per_thread is not None:
+            await self._prune_thread(thread_id, self.policy.max_checkpoints_per_thread)
+
+        if time.monotonic() - self._last_sweep >= self.policy.sweep_interval:
+            await self.sweep()
+
+    async def sweep(self) -> int:
+        """Evicts expired and excess sessions, returning how many were evicted."""
+        self._last_sweep = time.monotonic()
+        if self.policy.ttl is None and self.policy.max_sessions is None:
+            return 0
+
+        thread_ids = await self._select_evictions()
+        if thread_ids:
+            await self._delete_threads(thread_ids)
+            logger.info(f"Evicted {len(thread_ids)} sessions from the checkpointer")
+        return len(thread_ids)
+
+    async def open(self):
+        pass
+
+    async def close(self):
+        pass
+
+    @abstractmethod
+    async def _record_activity(self, thread_id: str):
+        pass
+
+    @abstractmethod
+    async def _prune_thread(self, thread_id: str, keep: int):
+        """Deletes all but the latest `keep` checkpoints of a thread."""
+        pass
+
+    @abstractmethod
+    async def _select_evictions(self) -> list[str]:
+        pass
+
+    @abstractmethod
+    async def _delete_threads(self, thread_ids: list[str]):
+        pass
+
+
+class MemoryCheckpointStore(CheckpointStore):
+    """Keeps checkpoints in process memory with a MemorySaver."""
+
+    def __init__(self, policy: CheckpointRetentionPolicy | None = None):
+        super().__init__(MemorySaver(), policy)
+        self.activity: OrderedDict[str, float] = OrderedDict()
+
+    async def _record_activity(self, thread_id: str):
+        self.activity[thread_id] = time.monotonic()
+        self.activity.move_to_end(thread_id)
+
+    async def _prune_thread(self, thread_id: str, keep: int):
+        saver = self.saver
+        namespaces = saver.storage.get(thread_id, {})
+        for checkpoint_ns, checkpoints in namespaces.items():
+            if len(checkpoints) <= keep:
+                continue
+
+            # Channel values are shared between checkpoints by version, so
+            # only versions no remaining checkpoint refers to are deleted.
+            checkpoint_ids = sorted(checkpoints)
+            unreferenced = set()
+            for checkpoint_id in checkpoint_ids[:-keep]:
+                checkpoint = checkpoints.pop(checkpoint_id)[0]
+                unreferenced.update(self._channel_versions(checkpoint))
+                saver.writes.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+            for checkpoint, _, _ in checkpoints.values():
+                unreferenced.difference_update(self._channel_versions(checkpoint))
+            for channel, version in unreferenced:
+                saver.blobs.pop((thread_id, checkpoint_ns, channel, version), None)
+
+    def _channel_versions(self, checkpoint) -> set[tuple[str, str]]:
+        return set(self.saver.serde.loads_typed(checkpoint)["channel_versions"].items())
+
+    async def _select_evictions(self) -> list[str]:
+        selected = []
+        if self.policy.ttl is not None:
+            expires_before = time.monotonic() - self.policy.ttl
+            for thread_id, last_used in self.activity.items():
+                if last_used >= expires_before:
+                    break
+                selected.append(thread_id)
+
+        if self.policy.max_sessions is not None:
+            excess = len(self.activity) - len(selected) - self.policy.max_sessions
+            if excess > 0:
+                remaining = list(self.activity)[len(selected):]
+                selected.extend(remaining[:excess])
+        return selected
+
+    async def _delete_threads(self, thread_ids: list[str]):
+        # One pass over the shared write and blob maps for all evicted threads.
+        evicted = set(thread_ids)
+        saver = self.saver
+        for thread_id in evicted:
+            saver.storage.pop(thread_id, None)
+            self.activity.pop(thread_id, None)
+        for key in [key for key in saver.writes if key[0] in evicted]:
+            del saver.writes[key]
+        for key in [key for key in saver.blobs if key[0] in evicted]:
+            del saver.blobs[key]
+
+
+class SqliteCheckpointStore(CheckpointStore):
+    """Keeps checkpoints in an SQLite database so sessions survive restarts.
+
+    Requires the "sqlite" extra (aiosqlite and langgraph-checkpoint-sqlite).
+    Session activity is stored next to the checkpoints, so TTLs also carry
+    over restarts. The connection is bound to the event loop that opens it,
+    so `open` must run on the server's loop.
+    """
+
+    def __init__(self, path: str, policy: CheckpointRetentionPolicy | None = None):
+        if AsyncSqliteSaver is None:
+            raise ValueError(
+                "SQLite checkpoints require the sqlite extra: "
+                "install aiosqlite and langgraph-checkpoint-sqlite"
+            )
+
+        super().__init__(None, policy)
+        self.path = path
+        self._open_lock = asyncio.Lock()
+
+    async def open(self):
+        async with self._open_lock:
+            if self.saver is not None:
+                return
+
+            saver = AsyncSqliteSaver(await aiosqlite.connect(self.path))
+            # Creates the checkpoint tables.
+            await saver.setup()
+            async with saver.lock:
+                await saver.conn.execute(
+                    "CREATE TABLE IF NOT EXISTS session_activity ("
+                    "thread_id TEXT PRIMARY KEY, last_used REAL NOT NULL)"
+                )
+                await saver.conn.execute(
+                    "CREATE INDEX IF NOT EXISTS session_activity_last_used "
+                    "ON session_activity (last_used)"
+                )
+                await saver.conn.commit()
+            self.saver = saver
+
+    async def close(self):
+        async with self._open_lock:
+            if self.saver is not None:
+                await self.saver.conn.close()
+                self.saver = None
+
+    async def _record_activity(self, thread_id: str):
+        await self._execute(
+            "INSERT OR REPLACE INTO session_activity (thread_id, last_used) VALUES (?, ?)",
+            (thread_id, time.time()),
+        )
+
+    async def _prune_thread(self, thread_id: str, keep: int):
+        await self._execute(
+            "DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_id NOT IN ("
+            "SELECT latest.checkpoint_id FROM checkpoints AS latest "
+            "WHERE latest.thread_id = checkpoints.thread_id "
+            "AND latest.checkpoint_ns = checkpoints.checkpoint_ns "
+            "ORDER BY latest.checkpoint_id DESC LIMIT ?)",
+            (thread_id, keep),
+        )
+        await self._execute(
+            "DELETE FROM writes WHERE thread_id = ? AND NOT EXISTS ("
+            "SELECT 1 FROM checkpoints WHERE checkpoints.thread_id = writes.thread_id "
+            "AND checkpoints.checkpoint_ns = writes.checkpoint_ns "
+            "AND checkpoints.checkpoint_id = writes.checkpoint_id)",
+            (thread_id,),
+        )
+
+    async def _select_evictions(self) -> list[str]:
+        selected: list[str] = []
+        async with self.saver.lock:
+            if self.policy.ttl is not None:
+                async with self.saver.conn.execute(
+                    "SELECT thread_id FROM session_activity WHERE last_used < ?",
+                    (time.time() - self.policy.ttl,),
+                ) as cursor:
+                    selected.extend(row[0] for row in await cursor.fetchall())
+
+            if self.policy.max_sessions is not None:
+                async with self.saver.conn.execute(
+                    "SELECT thread_id FROM session_activity "
+                    "ORDER BY last_used DESC LIMIT -1 OFFSET ?",
+                    (self.policy.max_sessions,),
+                ) as cursor:
+                    excess = [row[0] for row in await cursor.fetchall()]
+                selected.extend(set(excess) - set(selected))
+        return selected
+
+    async def _delete_threads(self, thread_ids: list[str]):
+        for thread_id in thread_ids:
+            await self.saver.adelete_thread(thread_id)
+            await self._execute(
+                "DELETE FROM session_activity WHERE thread_id = ?", (thread_id,)
+            )
+
+    async def _execute(self, sql: str, parameters: tuple):
+        async with self.saver.lock:
+            await self.saver.conn.execute(sql, parameters)
+            await self.saver.conn.commit()
@@ -0,0 +1,154 @@
+from common.utils.in_memory_cache import InMemoryCache
+from datetime import date
+from typing import Any, Protocol
+import httpx
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_API_URL = "https://api.frankfurter.app"
+DEFAULT_LATEST_TTL = 3600
+
+
+def significant(rate: float, digits: int = 6) -> float:
+    """Rounds a derived rate to significant digits, so small rates keep their precision."""
+    return float(f"{rate:.{digits}g}")
+
+
+class RateStore(Protocol):
+    """Storage for cached rate tables, e.g. InMemoryCache or a persistent store."""
+
+    def get(self, key: str, default: Any = None) -> Any: ...
+
+    def set(self, key: str, value: Any, ttl: int | None = None) -> None: ...
+
+
+class ExchangeRateClient:
+    """Fetches exchange rates from the Frankfurter API and caches them.
+
+    The full rate table for a base currency is fetched once and cached per
+    (date, base currency); every pair is then answered from the cache. A pair
+    whose base was never fetched is derived as a cross rate from any cached
+    table of the same date that contains it. Rates for a past date never
+    change and are kept without expiry, while "latest" (and today's date)
+    expire after `latest_ttl` seconds. Requests share one pooled HTTP client,
+    so repeated lookups reuse the upstream connection.
+    """
+
+    CACHE_KEY_PREFIX = "exchange_rate:"
+
+    def __init__(
+        self,
+        base_url: str | None = None,
+        latest_ttl: int | None = None,
+        store: RateStore | None = None,
+        http_client: httpx.Client | None = None,
+    ):
+        self.base_url = (
+            base_url or os.getenv("FRANKFURTER_API_URL", DEFAULT_API_URL)
+        ).rstrip("/")
+        self.latest_ttl = (
+            latest_ttl
+            if latest_ttl is not None
+            else int(os.getenv("EXCHANGE_RATE_LATEST_TTL", DEFAULT_LATEST_TTL))
+        )
+        self.store = store if store is not None else InMemoryCache()
+        self._http_client = http_client
+        self._client_lock = threading.Lock()
+
+    def get_rates(
+        self,
+        currency_from: str,
+        currency_to: str | list[str],
+        currency_date: str = "latest",
+    ) -> dict[str, Any]:
+        """Returns the rates from `currency_from` to one or more currencies.
+
+        The result has the shape of a Frankfurter API response. Raises
+        httpx.HTTPError if the request fails and ValueError if the response
+        is not a rate table or lacks a requested currency.
+        """
+        targets = [currency_to] if isinstance(currency_to, str) else currency_to
+        targets = [target.upper() for target in targets]
+
+        table = self.get_table(currency_from, currency_date)
+        rates = {**table["rates"], table["base"]: 1.0}
+        missing = [target for target in targets if target not in rates]
+        if missing:
+            raise ValueError(f"No rate for {', '.join(missing)} in API response.")
+        return {
+            "amount": table["amount"],
+            "base": table["base"],
+            "date": table["date"],
+            "rates": {target: rates[target] for target in targets},
+        }
+
+    def get_table(self, currency_from: str, currency_date: str = "latest") -> dict[str, Any]:
+        """Returns the full rate table for `currency_from`, fetching it if needed."""
+        currency_from = currency_from.upper()
+        key = self._cache_key(currency_date, currency_from)
+
+        table = self.store.get(key)
+        if table is not None:
+            logger.debug(f"Exchange rate cache hit for {key}")
+            return table
+
+        bases_key = self._cache_key(currency_date, "bases")
+        bases = self.store.get(bases_key) or []
+        for base in bases:
+            base_table = self.store.get(self._cache_key(currency_date, base))
+            if base_table is not None and currency_from in base_table["rates"]:
+                logger.debug(f"Deriving {currency_from} rates from cached {base} rates")
+                return self._rebase(base_table, currency_from)
+
+        table = self._fetch(currency_date, currency_from)
+        ttl = self._ttl_for(currency_date)
+        self.store.set(key, table, ttl)
+        self.store.set(bases_key, [*bases, currency_from], ttl)
+        return table
+
+    def close(self):
+        if self._http_client is not None:
+            self._http_client.close()
+            self._http_client = None
+
+    def _fetch(self, currency_date: str, currency_from: str) -> dict[str, Any]:
+        response = self._client().get(f"/{currency_date}", params={"from": currency_from})
+        response.raise_for_status()
+
+        data = response.json()
+        if "rates" not in data:
+            raise ValueError("Invalid API response format.")
+        return data
+
+    def _rebase(self, table: dict[str, Any], currency_from: str) -> dict[str, Any]:
+        """Derives the table for `currency_from` from another base's table."""
+        pivot = table["rates"][currency_from]
+        rates = {
+            currency: significant(rate / pivot)
+            for currency, rate in table["rates"].items()
+            if currency != currency_from
+        }
+        rates[table["base"]] = significant(1 / pivot)
+        return {**table, "base": currency_from, "rates": rates}
+
+    def _client(self) -> httpx.Client:
+        if self._http_client is None:
+            with self._client_lock:
+                if self._http_client is None:
+                    self._http_client = httpx.Client(base_url=self.base_url)
+        return self._http_client
+
+    def _cache_key(self, currency_date: str, currency_from: str) -> str:
+        return f"{self.CACHE_KEY_PREFIX}{self.base_url}:{currency_date}:{currency_from}"
+
+    def _ttl_for(self, currency_date: str) -> int | None:
+        if currency_date == "latest":
+            return self.latest_ttl
+        try:
+            is_past = date.fromisoformat(currency_date) < date.today()
+        except ValueError:
+            return self.latest_ttl
+        return None if is_past else self.latest_ttl
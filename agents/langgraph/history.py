@@ -0,0 +1,140 @@
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import BaseMessage, HumanMessage
+from pydantic import BaseModel
+from typing import Any
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_MESSAGE_ID = "history-summary"
+
+
+class HistoryPolicy(BaseModel):
+    """Limits on the conversation history replayed to the model.
+
+    History is cut at turn boundaries (a turn starts with a user message), so
+    a tool call is never separated from its result. `max_turns` keeps the
+    latest turns and `max_tokens` keeps as many of the latest turns as fit an
+    approximate token budget; the latest turn is always kept. With
+    `summarize` set, the turns that are cut are folded into a summary message
+    at the start of the history instead of being dropped. A limit set to None
+    is not enforced.
+
+    Once a limit is exceeded the history is trimmed to `retain_ratio` of it,
+    so compaction (and a summary call) happens every few turns rather than
+    on every turn past the limit.
+    """
+
+    max_turns: int | None = None
+    max_tokens: int | None = None
+    summarize: bool = False
+    retain_ratio: float = 0.5
+
+
+def message_text(message: BaseMessage) -> str:
+    if isinstance(message.content, str):
+        return message.content
+    return "".join(
+        part if isinstance(part, str) else part.get("text", "")
+        for part in message.content
+    )
+
+
+def approximate_tokens(messages: list[BaseMessage]) -> int:
+    """Estimates the prompt tokens of `messages` at about 4 characters per token."""
+    characters = 0
+    for message in messages:
+        characters += len(message_text(message))
+        for tool_call in getattr(message, "tool_calls", None) or []:
+            characters += len(tool_call["name"]) + len(json.dumps(tool_call["args"]))
+    # A few tokens of framing per message.
+    return characters // 4 + 4 * len(messages)
+
+
+def is_summary(message: BaseMessage) -> bool:
+    return message.id == SUMMARY_MESSAGE_ID
+
+
+def split_turns(messages: list[BaseMessage]) -> list[list[BaseMessage]]:
+    """Groups messages into turns, each starting with a user message."""
+    turns: list[list[BaseMessage]] = []
+    for message in messages:
+        if not turns or (isinstance(message, HumanMessage) and not is_summary(message)):
+            turns.append([])
+        turns[-1].append(message)
+    return turns
+
+
+def select_history(
+    messages: list[BaseMessage], policy: HistoryPolicy
+) -> tuple[list[BaseMessage], list[BaseMessage]]:
+    """Splits the history into the messages to cut and the messages to keep.
+
+    An existing summary message is never counted as a turn; it is cut
+    together with the oldest turns so that a new summary can replace it.
+    """
+    summary = [message for message in messages[:1] if is_summary(message)]
+    turns = split_turns(messages[len(summary):])
+
+    keep = len(turns)
+    if policy.max_turns is not None and keep > max(policy.max_turns, 1):
+        keep = max(int(policy.max_turns * policy.retain_ratio), 1)
+    if policy.max_tokens is not None and approximate_tokens(messages) > policy.max_tokens:
+        budget = policy.max_tokens * policy.retain_ratio - approximate_tokens(summary)
+        kept_tokens = 0
+        for count, turn in enumerate(reversed(turns[len(turns) - keep:])):
+            kept_tokens += approximate_tokens(turn)
+            if count > 0 and kept_tokens > budget:
+                keep = count
+                break
+
+    cut = [message for turn in turns[: len(turns) - keep] for message in turn]
+    kept = [message for turn in turns[len(turns) - keep:] for message in turn]
+    if cut:
+        cut = summary + cut
+    else:
+        kept = summary + kept
+    return cut, kept
+
+
+def summary_request(messages: list[BaseMessage]) -> str:
+    """Builds the prompt that asks the model to summarize `messages`."""
+    transcript = []
+    for message in messages:
+        if is_summary(message):
+            transcript.append(message_text(message))
+            continue
+        text = message_text(message)
+        for tool_call in getattr(message, "tool_calls", None) or []:
+            text += f" [called {tool_call['name']} with {json.dumps(tool_call['args'])}]"
+        transcript.append(f"{message.type}: {text}")
+
+    return (
+        "Summarize the following conversation in a few sentences. Keep every "
+        "currency, amount, date, rate and result that was mentioned.\n\n"
+        + "\n".join(transcript)
+    )
+
+
+def summary_message(summary: str) -> HumanMessage:
+    return HumanMessage(
+        id=SUMMARY_MESSAGE_ID,
+        content=f"Summary of the earlier conversation: {summary}",
+    )
+
+
+class PromptSizeLogger(BaseCallbackHandler):
+    """Logs the size of every prompt sent to a chat model."""
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+
+    def on_chat_model_start(
+        self, serialized: dict[str, Any], messages: list[list[BaseMessage]], **kwargs: Any
+    ) -> None:
+        for prompt in messages:
+            logger.info(
+                f"Prompt for session {self.session_id}: {len(prompt)} messages, "
+                f"~{approximate_tokens(prompt)} tokens"
+            )
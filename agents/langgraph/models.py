@@ -0,0 +1,179 @@
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import (
+    AIMessage,
+    AIMessageChunk,
+    BaseMessage,
+    ToolMessage,
+)
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.runnables import RunnableLambda
+from langchain_google_genai import ChatGoogleGenerativeAI
+from typing import Any, AsyncIterator, Iterator
+import asyncio
+import json
+import time
+
+MODEL_PROVIDERS = ["google", "fake"]
+
+# Arguments the scripted model passes to each of the agent's tools.
+SCRIPTED_TOOL_ARGS = {
+    "get_exchange_rate": {"currency_from": "USD", "currency_to": "EUR"},
+    "get_exchange_rates": {"currency_from": "USD", "currencies_to": ["EUR", "GBP"]},
+    "calculate_math": {"expression": "2 * 3"},
+    "calculate_math_batch": {"expressions": ["2 * 3", "10 / 4"]},
+}
+
+
+class ScriptedChatModel(BaseChatModel):
+    """A deterministic chat model for offline runs and load tests.
+
+    For a new user message it calls the tools named in `tool_calls` (when
+    tools are bound), and once the tool results are in it answers with a
+    fixed text that echoes them. Every call waits `latency` seconds before
+    the first token and then produces `tokens_per_second` tokens, streaming
+    them when streamed. Structured output always reports a completed answer.
+    """
+
+    latency: float = 0.5
+    tokens_per_second: float = 50.0
+    tool_calls: list[str] = ["calculate_math"]
+    bound_tools: list[str] = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def bind_tools(self, tools: list[Any], **kwargs: Any) -> "ScriptedChatModel":
+        names = [getattr(tool, "name", None) or tool.__name__ for tool in tools]
+        return self.model_copy(update={"bound_tools": names})
+
+    def with_structured_output(self, schema: Any, **kwargs: Any) -> RunnableLambda:
+        def respond(messages: list[BaseMessage]) -> Any:
+            time.sleep(self._duration(self._answer(messages)))
+            return schema(status="completed", message=self._answer(messages))
+
+        async def arespond(messages: list[BaseMessage]) -> Any:
+            await asyncio.sleep(self._duration(self._answer(messages)))
+            return schema(status="completed", message=self._answer(messages))
+
+        return RunnableLambda(respond, afunc=arespond)
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        message = self._next_message(messages)
+        time.sleep(self._duration(message.content))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        message = self._next_message(messages)
+        await asyncio.sleep(self._duration(message.content))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self.latency)
+        for chunk in self._chunks(self._next_message(messages)):
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+            time.sleep(self._token_interval())
+
+    async def _astream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        await asyncio.sleep(self.latency)
+        for chunk in self._chunks(self._next_message(messages)):
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+            await asyncio.sleep(self._token_interval())
+
+    def _next_message(self, messages: list[BaseMessage]) -> AIMessage:
+        calls = [name for name in self.tool_calls if name in self.bound_tools]
+        if calls and not isinstance(messages[-1], ToolMessage):
+            turn = sum(1 for message in messages if message.type == "human")
+            return AIMessage(
+                content="",
+                tool_calls=[
+                    {"name": name, "args": SCRIPTED_TOOL_ARGS.get(name, {}), "id": f"call_{turn}_{i}"}
+                    for i, name in enumerate(calls)
+                ],
+            )
+        return AIMessage(content=self._answer(messages))
+
+    def _answer(self, messages: list[BaseMessage]) -> str:
+        last = messages[-1]
+        if isinstance(last, AIMessage) and not last.tool_calls and last.content:
+            # Structured output restates the answer that was just given.
+            return last.content
+
+        results = []
+        for message in reversed(messages):
+            if not isinstance(message, ToolMessage):
+                break
+            results.insert(0, f"{message.name}: {message.content}")
+        if not results:
+            return "This is a scripted answer."
+        return "This is a scripted answer based on " + "; ".join(results)
+
+    def _chunks(self, message: AIMessage) -> Iterator[ChatGenerationChunk]:
+        if message.tool_calls:
+            yield ChatGenerationChunk(
+                message=AIMessageChunk(
+                    content="",
+                    tool_call_chunks=[
+                        {
+                            "name": call["name"],
+                            "args": json.dumps(call["args"]),
+                            "id": call["id"],
+                            "index": i,
+                        }
+                        for i, call in enumerate(message.tool_calls)
+                    ],
+                )
+            )
+            return
+
+        words = message.content.split(" ")
+        for i, word in enumerate(words):
+            text = word if i == len(words) - 1 else word + " "
+            yield ChatGenerationChunk(message=AIMessageChunk(content=text))
+
+    def _duration(self, content: str) -> float:
+        return self.latency + len(content.split()) * self._token_interval()
+
+    def _token_interval(self) -> float:
+        return 1 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+
+
+def create_chat_model(provider: str = "google", **options: Any) -> BaseChatModel:
+    """Creates the agent's chat model. Options are passed to the scripted model."""
+    if provider == "google":
+        return ChatGoogleGenerativeAI(model="gemini-2.0-flash")
+    if provider == "fake":
+        return ScriptedChatModel(**options)
+    raise ValueError(f"Unsupported model provider: {provider}")
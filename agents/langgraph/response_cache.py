@@ -0,0 +1,58 @@
+from common.utils.in_memory_cache import InMemoryCache
+from collections import OrderedDict
+from pydantic import BaseModel
+from typing import Any
+import hashlib
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """Caches the agent's completed answers to opening questions.
+
+    Only the first turn of a session is cached, since later answers depend on
+    the conversation so far. Queries are matched on their normalized text
+    together with a context string (e.g. the agent's instructions and tools).
+
+    Entries expire after `ttl` seconds. An answer may be cached just before
+    the data it was based on expires, so it can reflect data up to the
+    data's own TTL plus `ttl` old. At most `max_entries` answers are kept;
+    beyond that the least recently used one is dropped.
+    """
+
+    CACHE_KEY_PREFIX = "agent_response:"
+
+    def __init__(self, ttl: int | None, store: Any | None = None, max_entries: int = 1024):
+        self.ttl = ttl
+        self.store = store if store is not None else InMemoryCache()
+        self.max_entries = max_entries
+        # Keys this cache wrote to the store, least recently used first.
+        self._keys: OrderedDict[str, None] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, query: str, context: str = "") -> str:
+        normalized = " ".join(query.lower().split()).rstrip("?.! ")
+        digest = hashlib.sha256(f"{context}\n{normalized}".encode()).hexdigest()
+        return f"{self.CACHE_KEY_PREFIX}{digest}"
+
+    def get(self, key: str) -> BaseModel | None:
+        response = self.store.get(key)
+        if response is None:
+            self.misses += 1
+            self._keys.pop(key, None)
+        else:
+            self.hits += 1
+            self._keys[key] = None
+            self._keys.move_to_end(key)
+            logger.debug(f"Response cache hit for {key}")
+        return response
+
+    def set(self, key: str, response: BaseModel):
+        self.store.set(key, response, self.ttl)
+        self._keys[key] = None
+        self._keys.move_to_end(key)
+        while len(self._keys) > self.max_entries:
+            oldest, _ = self._keys.popitem(last=False)
+            self.store.delete(oldest)
@@ -0,0 +1,104 @@
+import ast
+import math
+import operator
+import time
+
+MAX_EXPRESSION_LENGTH = 200
+MAX_MAGNITUDE = 10**100
+MAX_EXPONENT = 1000
+MAX_EVALUATION_SECONDS = 0.1
+
+BINARY_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Pow: operator.pow,
+}
+
+UNARY_OPERATORS = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
+
+class EvaluationError(ValueError):
+    """Raised when an expression is invalid or exceeds the evaluation limits."""
+
+    pass
+
+
+class SafeMathEvaluator:
+    """Evaluates arithmetic expressions with bounded cost.
+
+    Only numbers, parentheses and the operators + - * / // ** are accepted.
+    The expression length, the magnitude of every operand and intermediate
+    result, the size of exponents and the total evaluation time are all
+    bounded, so no input can make evaluation run away.
+    """
+
+    def __init__(
+        self,
+        max_length: int = MAX_EXPRESSION_LENGTH,
+        max_magnitude: int | float = MAX_MAGNITUDE,
+        max_exponent: int = MAX_EXPONENT,
+        max_seconds: float = MAX_EVALUATION_SECONDS,
+    ):
+        self.max_length = max_length
+        self.max_magnitude = max_magnitude
+        self.max_exponent = max_exponent
+        self.max_seconds = max_seconds
+
+    def evaluate(self, expression: str) -> int | float:
+        if len(expression) > self.max_length:
+            raise EvaluationError(
+                f"Expression is longer than {self.max_length} characters."
+            )
+        try:
+            tree = ast.parse(expression.strip(), mode="eval")
+        except SyntaxError:
+            raise EvaluationError("Invalid expression syntax.")
+
+        deadline = time.monotonic() + self.max_seconds
+        return self._eval(tree.body, deadline)
+
+    def _eval(self, node: ast.AST, deadline: float) -> int | float:
+        if time.monotonic() > deadline:
+            raise EvaluationError("Evaluation took too long.")
+
+        if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+            return self._check_magnitude(node.value)
+        if isinstance(node, ast.UnaryOp) and type(node.op) in UNARY_OPERATORS:
+            return UNARY_OPERATORS[type(node.op)](self._eval(node.operand, deadline))
+        if isinstance(node, ast.BinOp) and type(node.op) in BINARY_OPERATORS:
+            left = self._eval(node.left, deadline)
+            right = self._eval(node.right, deadline)
+            if isinstance(node.op, ast.Pow):
+                self._check_power(left, right)
+            try:
+                result = BINARY_OPERATORS[type(node.op)](left, right)
+            except ZeroDivisionError:
+                raise EvaluationError("Division by zero.")
+            except OverflowError:
+                raise EvaluationError("Result is too large.")
+            if isinstance(result, complex):
+                raise EvaluationError("Result is not a real number.")
+            return self._check_magnitude(result)
+
+        raise EvaluationError(
+            "Unsupported expression. Use numbers, +, -, *, /, //, **, () and spaces only."
+        )
+
+    def _check_power(self, base: int | float, exponent: int | float):
+        if abs(exponent) > self.max_exponent:
+            raise EvaluationError(f"Exponent is larger than {self.max_exponent}.")
+        # Reject oversized results before computing them.
+        if abs(base) > 1 and exponent > 0:
+            if exponent * math.log10(abs(base)) > math.log10(self.max_magnitude):
+                raise EvaluationError("Result is too large.")
+
+    def _check_magnitude(self, value: int | float) -> int | float:
+        if abs(value) > self.max_magnitude:
+            raise EvaluationError("Number is too large.")
+        return value
@@ -15,38 +15,108 @@ from common.types import (
     TaskArtifactUpdateEvent,
     TaskStatusUpdateEvent,
     Task,
-    TaskIdParams,
+    TaskResubscriptionParams,
     PushNotificationConfig,
     SetTaskPushNotificationRequest,
     SetTaskPushNotificationResponse,
     TaskPushNotificationConfig,
     TaskNotFoundError,
     InvalidParamsError,
+    ServerBusyError,
 )
 from common.server.task_manager import InMemoryTaskManager
+from common.server.retention import TaskRetentionPolicy
+from common.server.scheduler import ExecutionScheduler, SchedulerBusyError
+from common.server.task_store import TaskStore
 from agents.langgraph.agent import CurrencyAgent
 from common.utils.push_notification_auth import PushNotificationSenderAuth
 import common.server.utils as utils
 from typing import Union
 import asyncio
 import logging
+import time
 import traceback
 
 logger = logging.getLogger(__name__)
 
 
 class AgentTaskManager(InMemoryTaskManager):
-    def __init__(self, agent: CurrencyAgent, notification_sender_auth: PushNotificationSenderAuth):
-        super().__init__()
+    def __init__(
+        self,
+        agent: CurrencyAgent,
+        notification_sender_auth: PushNotificationSenderAuth,
+        task_store: TaskStore | None = None,
+        retention_policy: TaskRetentionPolicy | None = None,
+        scheduler: ExecutionScheduler | None = None,
+        chunk_persist_interval: float = 1.0,
+    ):
+        super().__init__(
+            task_store=task_store,
+            retention_policy=retention_policy,
+            scheduler=scheduler,
+        )
         self.agent = agent
         self.notification_sender_auth = notification_sender_auth
+        # Streamed answer chunks go to subscribers at once but are written to
+        # the task store at most this often, and with the final answer.
+        self.chunk_persist_interval = chunk_persist_interval
+
+    async def start(self):
+        await super().start()
+        await self.agent.open()
+
+    async def stop(self):
+        await self.agent.close()
+        await super().stop()
 
     async def _run_streaming_agent(self, request: SendTaskStreamingRequest):
         task_send_params: TaskSendParams = request.params
         query = self._get_user_query(task_send_params)
 
+        streaming_artifact = False
+        # Chunks sent to subscribers but not yet written to the task store.
+        unsaved_chunks: list[str] = []
+        saved_chunks = False
+        last_save = time.monotonic()
+
+        async def save_chunks():
+            nonlocal saved_chunks, last_save
+            artifact = Artifact(
+                parts=[{"type": "text", "text": "".join(unsaved_chunks)}],
+                index=0,
+                append=saved_chunks,
+                lastChunk=False,
+            )
+            await self.update_store(task_send_params.id, None, [artifact])
+            unsaved_chunks.clear()
+            saved_chunks = True
+            last_save = time.monotonic()
+
         try:
-            async for item in self.agent.stream(query, task_send_params.sessionId):
+            async for item in self.agent.stream(
+                query,
+                task_send_params.sessionId,
+                use_cache=self._use_response_cache(task_send_params),
+            ):
+                if item.get("is_chunk"):
+                    # Answer chunks build up artifact 0 until the final
+                    # response replaces it.
+                    artifact = Artifact(
+                        parts=[{"type": "text", "text": item["content"]}],
+                        index=0,
+                        append=streaming_artifact,
+                        lastChunk=False,
+                    )
+                    streaming_artifact = True
+                    await self.enqueue_events_for_sse(
+                        task_send_params.id,
+                        TaskArtifactUpdateEvent(id=task_send_params.id, artifact=artifact),
+                    )
+                    unsaved_chunks.append(item["content"])
+                    if time.monotonic() - last_save >= self.chunk_persist_interval:
+                        await save_chunks()
+                    continue
+
                 is_task_complete = item["is_task_complete"]
                 require_user_input = item["require_user_input"]
                 artifact = None
@@ -63,9 +133,19 @@ class AgentTaskManager(InMemoryTaskManager):
                     end_stream = True
                 else:
                     task_state = TaskState.COMPLETED
-                    artifact = Artifact(parts=parts, index=0, append=False)
+                    artifact = Artifact(
+                        parts=parts,
+                        index=0,
+                        append=False,
+                        lastChunk=True if streaming_artifact else None,
+                    )
                     end_stream = True
 
+                # The final answer replaces the streamed one, so chunks only
+                # need saving when the answer stops short of it.
+                if unsaved_chunks and artifact is None:
+                    await save_chunks()
+
                 task_status = TaskStatus(state=task_state, message=message)
                 latest_task = await self.update_store(
                     task_send_params.id,
@@ -127,16 +207,44 @@ class AgentTaskManager(InMemoryTaskManager):
             if not await self.set_push_notification_info(request.params.id, request.params.pushNotification):
                 return SendTaskResponse(id=request.id, error=InvalidParamsError(message="Push notification URL is invalid"))
 
-        await self.upsert_task(request.params)
-        task = await self.update_store(
-            request.params.id, TaskStatus(state=TaskState.WORKING), None
-        )
-        await self.send_task_notification(task)
+        try:
+            ticket = self.admit_execution(request.params.metadata)
+        except SchedulerBusyError:
+            return SendTaskResponse(id=request.id, error=ServerBusyError())
 
-        task_send_params: TaskSendParams = request.params
-        query = self._get_user_query(task_send_params)
         try:
-            agent_response = self.agent.invoke(query, task_send_params.sessionId)
+            await self.upsert_task(request.params)
+            task = await self.update_store(
+                request.params.id, TaskStatus(state=TaskState.WORKING), None
+            )
+            await self.send_task_notification(task)
+
+            task_send_params: TaskSendParams = request.params
+            query = self._get_user_query(task_send_params)
+        except Exception:
+            self.discard_execution(ticket)
+            raise
+
+        execution = self.start_execution(
+            task_send_params.id,
+            self.agent.invoke(
+                query,
+                task_send_params.sessionId,
+                use_cache=self._use_response_cache(task_send_params),
+            ),
+            ticket,
+        )
+        try:
+            agent_response = await asyncio.shield(execution)
+        except asyncio.CancelledError:
+            if not execution.cancelled():
+                raise
+            # Canceled through tasks/cancel, which already updated the task.
+            task = await self.task_store.get(task_send_params.id)
+            return SendTaskResponse(
+                id=request.id,
+                result=self.append_task_history(task, task_send_params.historyLength),
+            )
         except Exception as e:
             logger.error(f"Error invoking agent: {e}")
             raise ValueError(f"Error invoking agent: {e}")
@@ -152,16 +260,30 @@ class AgentTaskManager(InMemoryTaskManager):
             if error:
                 return error
 
-            await self.upsert_task(request.params)
+            task_send_params: TaskSendParams = request.params
+            # Admit before creating the task, so that a rejected request
+            # does not leave a task behind that nothing will run.
+            try:
+                ticket = self.admit_execution(task_send_params.metadata)
+            except SchedulerBusyError:
+                return JSONRPCResponse(id=request.id, error=ServerBusyError())
 
-            if request.params.pushNotification:
-                if not await self.set_push_notification_info(request.params.id, request.params.pushNotification):
-                    return JSONRPCResponse(id=request.id, error=InvalidParamsError(message="Push notification URL is invalid"))
+            try:
+                await self.upsert_task(request.params)
 
-            task_send_params: TaskSendParams = request.params
-            sse_event_queue = await self.setup_sse_consumer(task_send_params.id, False)            
+                if request.params.pushNotification:
+                    if not await self.set_push_notification_info(request.params.id, request.params.pushNotification):
+                        self.discard_execution(ticket)
+                        return JSONRPCResponse(id=request.id, error=InvalidParamsError(message="Push notification URL is invalid"))
 
-            asyncio.create_task(self._run_streaming_agent(request))
+                sse_event_queue = await self.setup_sse_consumer(task_send_params.id, False)
+            except Exception:
+                self.discard_execution(ticket)
+                raise
+
+            self.start_execution(
+                task_send_params.id, self._run_streaming_agent(request), ticket
+            )
 
             return self.dequeue_events_for_sse(
                 request.id, task_send_params.id, sse_event_queue
@@ -207,7 +329,12 @@ class AgentTaskManager(InMemoryTaskManager):
         if not isinstance(part, TextPart):
             raise ValueError("Only text parts are supported")
         return part.text
-    
+
+    def _use_response_cache(self, task_send_params: TaskSendParams) -> bool:
+        # Clients can bypass cached answers with {"response_cache": false}.
+        metadata = task_send_params.metadata or {}
+        return metadata.get("response_cache") is not False
+
     async def send_task_notification(self, task: Task):
         if not await self.has_push_notification_info(task.id):
             logger.info(f"No push notification info found for task {task.id}")
@@ -223,9 +350,11 @@ class AgentTaskManager(InMemoryTaskManager):
     async def on_resubscribe_to_task(
         self, request
     ) -> AsyncIterable[SendTaskStreamingResponse] | JSONRPCResponse:
-        task_id_params: TaskIdParams = request.params
+        task_id_params: TaskResubscriptionParams = request.params
         try:
-            sse_event_queue = await self.setup_sse_consumer(task_id_params.id, True)
+            sse_event_queue = await self.setup_sse_consumer(
+                task_id_params.id, True, task_id_params.lastEventId
+            )
             return self.dequeue_events_for_sse(request.id, task_id_params.id, sse_event_queue)
         except Exception as e:
             logger.error(f"Error while reconnecting to SSE stream: {e}")
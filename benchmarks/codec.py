@@ -0,0 +1,97 @@
+"""Compares the server's JSON codec paths on large Task payloads.
+
+The dict path is how the server used to handle messages: decode the body
+with json.loads, validate the dict, and encode responses by dumping the
+model to a dict that Starlette's JSONResponse encodes again. The bytes
+path validates straight from the body and writes pydantic-core JSON bytes.
+
+    uv run python -m benchmarks.codec --history 1000
+"""
+
+from common.server.codec import encode_model
+from common.types import (
+    Artifact,
+    GetTaskResponse,
+    Message,
+    SendTaskRequest,
+    Task,
+    TaskState,
+    TaskStatus,
+    TextPart,
+)
+from pydantic import TypeAdapter
+from starlette.responses import JSONResponse
+import click
+import json
+import time
+
+TEXT = "What is the exchange rate between USD and EUR on 2024-01-01? " * 4
+
+
+def build_task(history: int) -> Task:
+    messages = [
+        Message(role="user" if i % 2 == 0 else "agent", parts=[TextPart(text=TEXT)])
+        for i in range(history)
+    ]
+    return Task(
+        id="task-1",
+        sessionId="session-1",
+        status=TaskStatus(state=TaskState.COMPLETED, message=messages[-1]),
+        artifacts=[Artifact(parts=[TextPart(text=TEXT * 10)])],
+        history=messages,
+    )
+
+
+def build_request(parts: int) -> bytes:
+    request = SendTaskRequest(
+        id=1,
+        params={
+            "id": "task-1",
+            "sessionId": "session-1",
+            "message": {"role": "user", "parts": [{"type": "text", "text": TEXT}] * parts},
+        },
+    )
+    return encode_model(request)
+
+
+def timed(fn, iterations: int) -> float:
+    """Returns the mean time of one call, in milliseconds."""
+    fn()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations * 1000
+
+
+@click.command()
+@click.option("--history", default=1000, help="Messages in the task's history.")
+@click.option("--iterations", default=50)
+def main(history: int, iterations: int):
+    adapter = TypeAdapter(SendTaskRequest)
+    raw_request = build_request(history)
+    response = GetTaskResponse(id=1, result=build_task(history))
+
+    print(f"Request body: {len(raw_request) / 1024:.0f} KiB, "
+          f"response body: {len(encode_model(response)) / 1024:.0f} KiB")
+
+    results = {
+        "decode, dict path (json.loads + validate_python)": timed(
+            lambda: adapter.validate_python(json.loads(raw_request)), iterations
+        ),
+        "decode, bytes path (validate_json)": timed(
+            lambda: adapter.validate_json(raw_request), iterations
+        ),
+        "encode, dict path (model_dump + JSONResponse)": timed(
+            lambda: JSONResponse(response.model_dump(exclude_none=True)).body,
+            iterations,
+        ),
+        "encode, bytes path (model_dump_json)": timed(
+            lambda: encode_model(response), iterations
+        ),
+    }
+    for name, milliseconds in results.items():
+        print(f"{name:<55} {milliseconds:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Measures SSE fan-out of one task's events to 1, 10 and 100 subscribers.
+
+For each subscriber count the events of one task are streamed through
+InMemoryTaskManager to every subscriber, which encodes each event once and
+splices in each subscriber's request id. For comparison the encoding alone
+is timed both ways: once per event, shared by all subscribers, and once per
+subscriber, wrapping the event in its own SendTaskStreamingResponse.
+
+    uv run python -m benchmarks.fanout --events 200
+"""
+
+from benchmarks.helpers import BenchmarkTaskManager, add_task, drain
+from common.server.codec import encode_model
+from common.server.streaming import JournaledEvent, streaming_response_prefix
+from common.types import (
+    Artifact,
+    SendTaskStreamingResponse,
+    TaskArtifactUpdateEvent,
+    TaskState,
+    TaskStatus,
+    TaskStatusUpdateEvent,
+    TextPart,
+)
+import asyncio
+import click
+import time
+
+TEXT = "The exchange rate between USD and EUR is 0.92 as of today. " * 8
+
+
+def build_events(task_id: str, count: int) -> list:
+    events = [
+        TaskArtifactUpdateEvent(
+            id=task_id,
+            artifact=Artifact(parts=[TextPart(text=TEXT)], append=i > 0, lastChunk=False),
+        )
+        for i in range(count - 1)
+    ]
+    events.append(
+        TaskStatusUpdateEvent(
+            id=task_id, status=TaskStatus(state=TaskState.COMPLETED), final=True
+        )
+    )
+    return events
+
+
+async def stream(subscribers: int, events: list) -> float:
+    manager = BenchmarkTaskManager(sse_queue_size=0)
+    task_id = "task-1"
+    await add_task(manager, task_id)
+    queues = [await manager.setup_sse_consumer(task_id)]
+    for _ in range(subscribers - 1):
+        queues.append(await manager.setup_sse_consumer(task_id, True, None))
+    consumers = [
+        asyncio.create_task(drain(manager.dequeue_events_for_sse(i, task_id, queue)))
+        for i, queue in enumerate(queues)
+    ]
+
+    started = time.perf_counter()
+    for event in events:
+        await manager.enqueue_events_for_sse(task_id, event)
+    await asyncio.gather(*consumers)
+    return time.perf_counter() - started
+
+
+def encode_per_subscriber(subscribers: int, events: list) -> float:
+    started = time.perf_counter()
+    for event in events:
+        for request_id in range(subscribers):
+            encode_model(SendTaskStreamingResponse(id=request_id, result=event))
+    return time.perf_counter() - started
+
+
+def encode_shared(subscribers: int, events: list) -> float:
+    prefixes = [streaming_response_prefix(request_id) for request_id in range(subscribers)]
+    started = time.perf_counter()
+    for i, event in enumerate(events):
+        entry = JournaledEvent(i, event, encode_model(event))
+        for prefix in prefixes:
+            entry.encode_response(prefix)
+    return time.perf_counter() - started
+
+
+@click.command()
+@click.option("--events", default=200, help="Events streamed by the task.")
+def main(events: int):
+    task_events = build_events("task-1", events)
+    print(f"{events} events of ~{len(encode_model(task_events[0]))} bytes")
+    for subscribers in (1, 10, 100):
+        streamed = asyncio.run(stream(subscribers, task_events))
+        per_subscriber = encode_per_subscriber(subscribers, task_events)
+        shared = encode_shared(subscribers, task_events)
+        print(
+            f"{subscribers:>3} subscribers: streamed in {streamed * 1000:8.2f} ms; "
+            f"encoding per subscriber {per_subscriber * 1000:8.2f} ms, "
+            f"shared {shared * 1000:8.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""Pieces shared by the benchmark scripts."""
+
+from common.server.task_manager import InMemoryTaskManager
+from common.types import (
+    JSONRPCResponse,
+    Message,
+    TaskSendParams,
+    TextPart,
+    UnsupportedOperationError,
+)
+
+
+class BenchmarkTaskManager(InMemoryTaskManager):
+    """A task manager without an agent; benchmarks drive its tasks directly."""
+
+    async def on_send_task(self, request):
+        return JSONRPCResponse(id=request.id, error=UnsupportedOperationError())
+
+    async def on_send_task_subscribe(self, request):
+        return JSONRPCResponse(id=request.id, error=UnsupportedOperationError())
+
+
+async def add_task(manager: InMemoryTaskManager, task_id: str):
+    message = Message(role="user", parts=[TextPart(text="What is 2 * 3?")])
+    await manager.upsert_task(TaskSendParams(id=task_id, message=message))
+
+
+async def drain(events):
+    """Consumes a subscriber's events until its stream ends."""
+    async for _ in events:
+        pass
@@ -0,0 +1,104 @@
+"""Measures lock contention in InMemoryTaskManager under many concurrent tasks.
+
+Every fake task is created, streams a number of status updates to one SSE
+subscriber and is read back with tasks/get, all at the same time as the
+other tasks. The task store waits `--store-latency` seconds per call to
+stand in for a real backend. The run is repeated with a single lock stripe,
+which is what a global lock amounts to, and with the default striping.
+
+    uv run python -m benchmarks.lock_contention --tasks 500
+"""
+
+from benchmarks.helpers import BenchmarkTaskManager, add_task, drain
+from common.server.task_manager import InMemoryTaskManager
+from common.server.task_store import InMemoryTaskStore
+from common.types import (
+    GetTaskRequest,
+    TaskState,
+    TaskStatus,
+    TaskStatusUpdateEvent,
+)
+import asyncio
+import click
+import time
+
+
+class SlowTaskStore(InMemoryTaskStore):
+    """An in-memory store that takes `latency` seconds per call, like a database."""
+
+    def __init__(self, latency: float):
+        super().__init__()
+        self.latency = latency
+
+    async def get(self, task_id):
+        await asyncio.sleep(self.latency)
+        return await super().get(task_id)
+
+    async def upsert(self, task):
+        await asyncio.sleep(self.latency)
+        return await super().upsert(task)
+
+    async def update_status(self, task_id, status):
+        await asyncio.sleep(self.latency)
+        return await super().update_status(task_id, status)
+
+    async def append_history(self, task_id, messages):
+        await asyncio.sleep(self.latency)
+        return await super().append_history(task_id, messages)
+
+
+async def run_task(manager: InMemoryTaskManager, task_id: str, updates: int) -> list[float]:
+    await add_task(manager, task_id)
+    subscriber = await manager.setup_sse_consumer(task_id)
+    consumer = asyncio.create_task(
+        drain(manager.dequeue_events_for_sse(1, task_id, subscriber))
+    )
+
+    latencies = []
+    for i in range(updates):
+        final = i == updates - 1
+        status = TaskStatus(state=TaskState.COMPLETED if final else TaskState.WORKING)
+        started = time.perf_counter()
+        await manager.update_store(task_id, status, None)
+        await manager.enqueue_events_for_sse(
+            task_id, TaskStatusUpdateEvent(id=task_id, status=status, final=final)
+        )
+        await manager.on_get_task(GetTaskRequest(id=1, params={"id": task_id}))
+        latencies.append(time.perf_counter() - started)
+
+    await consumer
+    return latencies
+
+
+async def measure(tasks: int, updates: int, stripes: int, store_latency: float):
+    manager = BenchmarkTaskManager(
+        task_store=SlowTaskStore(store_latency), lock_stripes=stripes
+    )
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *(run_task(manager, f"task-{i}", updates) for i in range(tasks))
+    )
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for task in results for latency in task)
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000
+    print(
+        f"{stripes:>4} stripes: {elapsed:6.2f}s, {len(latencies) / elapsed:8.0f} updates/s, "
+        f"update p50 {p50:7.2f} ms, p99 {p99:7.2f} ms"
+    )
+
+
+@click.command()
+@click.option("--tasks", default=500, help="Concurrent tasks.")
+@click.option("--updates", default=10, help="Status updates per task.")
+@click.option("--store-latency", default=0.001, help="Seconds per task store call.")
+@click.option("--stripes", default=64, help="Lock stripes of the striped run.")
+def main(tasks: int, updates: int, store_latency: float, stripes: int):
+    print(f"{tasks} tasks x {updates} updates, {store_latency * 1000:.1f} ms per store call")
+    for lock_stripes in (1, stripes):
+        asyncio.run(measure(tasks, updates, lock_stripes, store_latency))
+
+
+if __name__ == "__main__":
+    main()
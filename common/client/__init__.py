@@ -1,4 +1,13 @@
 from .client import A2AClient
-from .card_resolver import A2ACardResolver
+from .card_resolver import A2ACardResolver, AgentCardCache
+from .policies import CircuitBreaker, ClientStats, HedgingPolicy, RetryPolicy
 
-__all__ = ["A2AClient", "A2ACardResolver"]
+__all__ = [
+    "A2AClient",
+    "A2ACardResolver",
+    "AgentCardCache",
+    "CircuitBreaker",
+    "ClientStats",
+    "HedgingPolicy",
+    "RetryPolicy",
+]
@@ -3,19 +3,166 @@ from common.types import (
     AgentCard,
     A2AClientJSONError,
 )
+from typing import NamedTuple
+import asyncio
 import json
+import threading
+import time
+
+
+class CachedAgentCard(NamedTuple):
+    card: AgentCard
+    etag: str | None
+    expires_at: float
+
+
+class AgentCardCache:
+    """An in-process cache of agent cards, keyed by card URL.
+
+    Entries are kept after they expire so that they can be revalidated with
+    a conditional request: when the agent answers 304 Not Modified the
+    cached card is reused and its lifetime renewed.
+    """
+
+    def __init__(self):
+        self._entries: dict[str, CachedAgentCard] = {}
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> CachedAgentCard | None:
+        with self._lock:
+            return self._entries.get(url)
+
+    def set(self, url: str, entry: CachedAgentCard):
+        with self._lock:
+            self._entries[url] = entry
+
+    def delete(self, url: str):
+        with self._lock:
+            self._entries.pop(url, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Shared by resolvers that are not given a cache of their own.
+DEFAULT_CARD_CACHE = AgentCardCache()
+
+
+def parse_max_age(cache_control: str | None) -> int | None:
+    """Returns how long a response may be reused, or None if it must not be stored."""
+    if not cache_control:
+        return 0
+    max_age = 0
+    for directive in cache_control.lower().split(","):
+        name, _, value = directive.strip().partition("=")
+        if name == "no-store":
+            return None
+        if name == "no-cache":
+            return 0
+        if name == "max-age":
+            try:
+                max_age = max(int(value.strip('"')), 0)
+            except ValueError:
+                max_age = 0
+    return max_age
 
 
 class A2ACardResolver:
-    def __init__(self, base_url, agent_card_path="/.well-known/agent.json"):
+    """Fetches an agent's card from its well-known URL.
+
+    Cards are cached in `cache` for as long as the agent's Cache-Control
+    header allows. Once a cached card expires it is revalidated with its
+    ETag, so an unchanged card costs a 304 response with no body.
+    """
+
+    def __init__(
+        self,
+        base_url,
+        agent_card_path="/.well-known/agent.json",
+        cache: AgentCardCache | None = None,
+    ):
         self.base_url = base_url.rstrip("/")
         self.agent_card_path = agent_card_path.lstrip("/")
+        self.cache = cache if cache is not None else DEFAULT_CARD_CACHE
+
+    @property
+    def url(self) -> str:
+        return self.base_url + "/" + self.agent_card_path
 
     def get_agent_card(self) -> AgentCard:
+        cached = self._get_fresh()
+        if cached is not None:
+            return cached
         with httpx.Client() as client:
-            response = client.get(self.base_url + "/" + self.agent_card_path)
+            response = client.get(self.url, headers=self._conditional_headers())
+            return self._handle_response(response)
+
+    async def get_agent_card_async(
+        self, httpx_client: httpx.AsyncClient | None = None
+    ) -> AgentCard:
+        """Fetches the card without blocking, on `httpx_client` if given."""
+        cached = self._get_fresh()
+        if cached is not None:
+            return cached
+        if httpx_client is None:
+            async with httpx.AsyncClient() as client:
+                return await self.get_agent_card_async(client)
+        response = await httpx_client.get(
+            self.url, headers=self._conditional_headers()
+        )
+        return self._handle_response(response)
+
+    @classmethod
+    async def resolve_all(
+        cls,
+        base_urls: list[str],
+        agent_card_path="/.well-known/agent.json",
+        cache: AgentCardCache | None = None,
+        httpx_client: httpx.AsyncClient | None = None,
+    ) -> list[AgentCard]:
+        """Fetches the cards of many agents concurrently, in the given order."""
+        if httpx_client is None:
+            async with httpx.AsyncClient() as client:
+                return await cls.resolve_all(base_urls, agent_card_path, cache, client)
+        return await asyncio.gather(
+            *(
+                cls(base_url, agent_card_path, cache).get_agent_card_async(httpx_client)
+                for base_url in base_urls
+            )
+        )
+
+    def _get_fresh(self) -> AgentCard | None:
+        cached = self.cache.get(self.url)
+        if cached is not None and cached.expires_at > time.monotonic():
+            return cached.card
+        return None
+
+    def _conditional_headers(self) -> dict[str, str]:
+        cached = self.cache.get(self.url)
+        if cached is not None and cached.etag:
+            return {"If-None-Match": cached.etag}
+        return {}
+
+    def _handle_response(self, response: httpx.Response) -> AgentCard:
+        max_age = parse_max_age(response.headers.get("cache-control"))
+        cached = self.cache.get(self.url)
+        if response.status_code == 304 and cached is not None:
+            card = cached.card
+            etag = response.headers.get("etag", cached.etag)
+        else:
             response.raise_for_status()
             try:
-                return AgentCard(**response.json())
+                card = AgentCard(**response.json())
             except json.JSONDecodeError as e:
                 raise A2AClientJSONError(str(e)) from e
+            etag = response.headers.get("etag")
+
+        if max_age is None or (not max_age and not etag):
+            # Nothing to reuse or revalidate later.
+            self.cache.delete(self.url)
+        else:
+            self.cache.set(
+                self.url, CachedAgentCard(card, etag, time.monotonic() + max_age)
+            )
+        return card
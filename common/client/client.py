@@ -1,6 +1,6 @@
 import httpx
-from httpx_sse import connect_sse
-from typing import Any, AsyncIterable
+from httpx_sse import aconnect_sse
+from typing import Any, AsyncIterable, AsyncIterator
 from common.types import (
     AgentCard,
     GetTaskRequest,
@@ -14,16 +14,100 @@ from common.types import (
     SetTaskPushNotificationResponse,
     GetTaskPushNotificationRequest,
     GetTaskPushNotificationResponse,
+    A2AClientError,
     A2AClientHTTPError,
     A2AClientJSONError,
     SendTaskStreamingRequest,
     SendTaskStreamingResponse,
+    JSONRPCResponse,
+    TaskResubscriptionRequest,
+    TaskArtifactUpdateEvent,
+    TaskStatusUpdateEvent,
+    TaskState,
+    SlowSubscriberError,
 )
+from common.client.policies import (
+    CircuitBreaker,
+    ClientStats,
+    HedgingPolicy,
+    RetryPolicy,
+)
+from contextlib import aclosing
+import asyncio
 import json
+import logging
+import random
+import time
+
+logger = logging.getLogger(__name__)
+
+
+RESPONSE_TYPES: dict[type[JSONRPCRequest], type[JSONRPCResponse]] = {
+    GetTaskRequest: GetTaskResponse,
+    SendTaskRequest: SendTaskResponse,
+    CancelTaskRequest: CancelTaskResponse,
+    SetTaskPushNotificationRequest: SetTaskPushNotificationResponse,
+    GetTaskPushNotificationRequest: GetTaskPushNotificationResponse,
+}
+
+
+# States after which a task's stream does not continue.
+FINAL_STATES = {
+    TaskState.COMPLETED,
+    TaskState.CANCELED,
+    TaskState.FAILED,
+    TaskState.INPUT_REQUIRED,
+}
+
+MAX_POLL_INTERVAL = 5.0
+
+DEFAULT_LIMITS = httpx.Limits(
+    max_connections=100, max_keepalive_connections=20, keepalive_expiry=30.0
+)
+
+
+def is_failure(error: Exception) -> bool:
+    """Whether an error means the remote agent is unhealthy."""
+    if isinstance(error, A2AClientHTTPError):
+        return error.status_code >= 500
+    return isinstance(error, httpx.RequestError)
+
+
+def is_resume_request(response: SendTaskStreamingResponse) -> bool:
+    """Whether the server dropped the stream and asks the client to resubscribe."""
+    return response.error is not None and response.error.code == SlowSubscriberError().code
+
+
+def is_final_response(response: SendTaskStreamingResponse) -> bool:
+    return response.error is not None or (
+        isinstance(response.result, TaskStatusUpdateEvent) and response.result.final
+    )
 
 
 class A2AClient:
-    def __init__(self, agent_card: AgentCard = None, url: str = None):
+    """JSON-RPC client for one remote agent.
+
+    Requests share one pooled `httpx.AsyncClient`, so connections to the agent
+    are kept alive and reused. Pass `httpx_client` to share a pool between
+    clients; a client passed in is not closed by `aclose`. Every call accepts
+    a `timeout` that overrides the client's default for that call.
+
+    Non-streaming calls can be retried, hedged and guarded by a circuit
+    breaker through the optional policies, and their latency and errors are
+    recorded in `stats`.
+    """
+
+    def __init__(
+        self,
+        agent_card: AgentCard = None,
+        url: str = None,
+        timeout: float | httpx.Timeout | None = 30.0,
+        limits: httpx.Limits | None = None,
+        httpx_client: httpx.AsyncClient | None = None,
+        retry_policy: RetryPolicy | None = None,
+        hedging_policy: HedgingPolicy | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+    ):
         if agent_card:
             self.url = agent_card.url
         elif url:
@@ -31,56 +115,357 @@ class A2AClient:
         else:
             raise ValueError("Must provide either agent_card or url")
 
-    async def send_task(self, payload: dict[str, Any]) -> SendTaskResponse:
+        self.timeout = timeout
+        self._owns_client = httpx_client is None
+        self._client = httpx_client or httpx.AsyncClient(
+            timeout=timeout, limits=limits or DEFAULT_LIMITS
+        )
+        self.retry_policy = retry_policy
+        self.hedging_policy = hedging_policy
+        self.circuit_breaker = circuit_breaker
+        self.stats = ClientStats()
+
+    def get_stats(self) -> dict[str, Any]:
+        stats = self.stats.snapshot()
+        if self.circuit_breaker is not None:
+            stats["circuit"] = self.circuit_breaker.state
+        return stats
+
+    async def aclose(self):
+        if self._owns_client:
+            await self._client.aclose()
+
+    async def __aenter__(self) -> "A2AClient":
+        return self
+
+    async def __aexit__(self, *exc_info: Any):
+        await self.aclose()
+
+    async def send_task(
+        self, payload: dict[str, Any], timeout: float | None = None
+    ) -> SendTaskResponse:
         request = SendTaskRequest(params=payload)
-        return SendTaskResponse(**await self._send_request(request))
+        return SendTaskResponse(**await self._send_request(request, timeout))
 
     async def send_task_streaming(
-        self, payload: dict[str, Any]
+        self,
+        payload: dict[str, Any],
+        timeout: float | None = None,
+        resume: bool = False,
+        max_resume_attempts: int = 5,
+        resume_backoff: float = 0.5,
+        max_poll_time: float = 300.0,
     ) -> AsyncIterable[SendTaskStreamingResponse]:
+        """Streams the task's events over SSE on the pooled client.
+
+        The stream has no timeout by default, since the agent may work for a
+        long time between events. With `resume` set, a dropped stream is
+        resumed with tasks/resubscribe from the last event received, retrying
+        with exponential backoff. If it cannot be resumed, the task is polled
+        with tasks/get until it finishes, for at most `max_poll_time` seconds,
+        and the artifacts not yet received and the final status are emitted
+        as events, so the caller sees a single uninterrupted stream. JSON-RPC
+        errors answered instead of a stream (e.g. server busy) are passed to
+        the caller and not retried.
+        """
         request = SendTaskStreamingRequest(params=payload)
-        with httpx.Client(timeout=None) as client:
-            with connect_sse(
-                client, "POST", self.url, json=request.model_dump()
+        if not resume:
+            async for _, response in self._stream(request, timeout):
+                yield response
+            return
+
+        async for response in self._resilient_stream(
+            request, timeout, max_resume_attempts, resume_backoff, max_poll_time
+        ):
+            yield response
+
+    async def resubscribe_task(
+        self,
+        payload: dict[str, Any],
+        timeout: float | None = None,
+    ) -> AsyncIterable[SendTaskStreamingResponse]:
+        """Streams the events of a running task, starting after `lastEventId`."""
+        request = TaskResubscriptionRequest(params=payload)
+        async for _, response in self._stream(request, timeout):
+            yield response
+
+    async def _stream(
+        self,
+        request: SendTaskStreamingRequest | TaskResubscriptionRequest,
+        timeout: float | None,
+    ) -> AsyncIterator[tuple[int | None, SendTaskStreamingResponse]]:
+        """Yields each streamed response together with its SSE event id."""
+        headers = {}
+        last_event_id = getattr(request.params, "lastEventId", None)
+        if last_event_id is not None:
+            headers["Last-Event-ID"] = str(last_event_id)
+
+        try:
+            async with aconnect_sse(
+                self._client,
+                "POST",
+                self.url,
+                json=request.model_dump(),
+                headers=headers,
+                timeout=timeout,
             ) as event_source:
-                try:
-                    for sse in event_source.iter_sse():
-                        yield SendTaskStreamingResponse(**json.loads(sse.data))
-                except json.JSONDecodeError as e:
-                    raise A2AClientJSONError(str(e)) from e
-                except httpx.RequestError as e:
-                    raise A2AClientHTTPError(400, str(e)) from e
-
-    async def _send_request(self, request: JSONRPCRequest) -> dict[str, Any]:
-        async with httpx.AsyncClient() as client:
+                response = event_source.response
+                if "text/event-stream" not in response.headers.get("content-type", ""):
+                    # The request was answered with a JSON-RPC error, not a stream.
+                    body = await response.aread()
+                    if "application/json" not in response.headers.get("content-type", ""):
+                        raise A2AClientHTTPError(response.status_code, body.decode(errors="replace"))
+                    yield None, SendTaskStreamingResponse(**json.loads(body))
+                    return
+                async for sse in event_source.aiter_sse():
+                    event_id = int(sse.id) if sse.id and sse.id.isdigit() else None
+                    yield event_id, SendTaskStreamingResponse(**json.loads(sse.data))
+        except json.JSONDecodeError as e:
+            raise A2AClientJSONError(str(e)) from e
+        except httpx.RequestError as e:
+            raise A2AClientHTTPError(400, str(e)) from e
+
+    async def _resilient_stream(
+        self,
+        request: SendTaskStreamingRequest,
+        timeout: float | None,
+        max_attempts: int,
+        backoff: float,
+        max_poll_time: float,
+    ) -> AsyncIterator[SendTaskStreamingResponse]:
+        task_id = request.params.id
+        # Event ids start at 1, so resuming before any event arrived replays
+        # every journaled event.
+        last_event_id = 0
+        attempt = 0
+        # Artifacts received in full, which the polling fallback skips.
+        delivered_artifacts = 0
+        current: SendTaskStreamingRequest | TaskResubscriptionRequest = request
+        resumable = True
+
+        while resumable:
             try:
-                # Image generation could take time, adding timeout
-                response = await client.post(
-                    self.url, json=request.model_dump(), timeout=30
+                async with aclosing(self._stream(current, timeout)) as stream:
+                    async for event_id, response in stream:
+                        if is_resume_request(response):
+                            logger.warning(f"Stream for task {task_id} fell behind, resubscribing")
+                            break
+                        if response.error is not None and current is not request:
+                            # The server no longer streams the task (e.g. its
+                            # journal expired), but tasks/get may still find it.
+                            logger.warning(
+                                f"Cannot resubscribe to task {task_id}: {response.error.message}"
+                            )
+                            resumable = False
+                            break
+                        attempt = 0
+                        if event_id is not None:
+                            last_event_id = event_id
+                        if (
+                            isinstance(response.result, TaskArtifactUpdateEvent)
+                            and response.result.artifact.lastChunk is not False
+                        ):
+                            delivered_artifacts += 1
+                        yield response
+                        if is_final_response(response):
+                            return
+                    else:
+                        logger.warning(f"Stream for task {task_id} ended without a final event")
+            except A2AClientHTTPError as e:
+                logger.warning(f"Stream for task {task_id} dropped: {e}")
+
+            attempt += 1
+            if not resumable or attempt > max_attempts:
+                break
+            # Full jitter keeps reconnecting clients from moving in lockstep.
+            await asyncio.sleep(random.uniform(0, backoff * 2 ** (attempt - 1)))
+            current = TaskResubscriptionRequest(
+                params={"id": task_id, "lastEventId": last_event_id}
+            )
+
+        logger.warning(f"Could not resume stream for task {task_id}, polling it")
+        poll = 0
+        deadline = asyncio.get_running_loop().time() + max_poll_time
+        while True:
+            task = (await self.get_task({"id": task_id})).result
+            if task is None:
+                raise A2AClientHTTPError(404, f"Task {task_id} not found after stream loss")
+            if task.status.state in FINAL_STATES:
+                break
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                raise A2AClientHTTPError(
+                    504, f"Task {task_id} did not finish within {max_poll_time}s after stream loss"
                 )
-                response.raise_for_status()
-                return response.json()
-            except httpx.HTTPStatusError as e:
-                raise A2AClientHTTPError(e.response.status_code, str(e)) from e
-            except json.JSONDecodeError as e:
-                raise A2AClientJSONError(str(e)) from e
-
-    async def get_task(self, payload: dict[str, Any]) -> GetTaskResponse:
+            await asyncio.sleep(min(backoff * 2**poll, MAX_POLL_INTERVAL, remaining))
+            poll += 1
+        for artifact in (task.artifacts or [])[delivered_artifacts:]:
+            yield SendTaskStreamingResponse(
+                id=request.id,
+                result=TaskArtifactUpdateEvent(id=task.id, artifact=artifact),
+            )
+        yield SendTaskStreamingResponse(
+            id=request.id,
+            result=TaskStatusUpdateEvent(
+                id=task.id, status=task.status, final=True, metadata=task.metadata
+            ),
+        )
+
+    async def send_batch(
+        self, requests: list[JSONRPCRequest], timeout: float | None = None
+    ) -> list[JSONRPCResponse]:
+        """Sends several requests as one JSON-RPC batch.
+
+        Responses are returned in the order of `requests`, each parsed into the
+        response type matching its request (e.g. `GetTaskResponse`).
+        """
+        if not requests:
+            return []
+
+        body = await self._send_request(
+            [request.model_dump() for request in requests], timeout
+        )
+        if not isinstance(body, list):
+            # The server rejected the batch as a whole.
+            return [JSONRPCResponse(**body) for _ in requests]
+
+        responses_by_id = {item.get("id"): item for item in body}
+        responses = []
+        for request in requests:
+            response_type = RESPONSE_TYPES.get(type(request), JSONRPCResponse)
+            item = responses_by_id.get(request.id)
+            if item is None:
+                raise A2AClientJSONError(f"Missing response for request {request.id}")
+            responses.append(response_type(**item))
+        return responses
+
+    async def _send_request(
+        self,
+        request: JSONRPCRequest | list[dict[str, Any]],
+        timeout: float | None = None,
+    ) -> dict[str, Any] | list[dict[str, Any]]:
+        payload = request if isinstance(request, list) else request.model_dump()
+        method = "batch" if isinstance(request, list) else request.method
+
+        attempt = 0
+        while True:
+            attempt += 1
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.before_call()
+            try:
+                body = await self._post_hedged(method, payload, timeout)
+            except (A2AClientError, httpx.RequestError) as e:
+                if self.circuit_breaker is not None:
+                    if is_failure(e):
+                        self.circuit_breaker.record_failure()
+                    else:
+                        # The agent answered, it just rejected the request.
+                        self.circuit_breaker.record_success()
+                if self.retry_policy is None or not self.retry_policy.should_retry(
+                    method, e, attempt
+                ):
+                    raise
+                self.stats.retries += 1
+                logger.warning(f"Retrying {method} to {self.url} after error: {e}")
+                await asyncio.sleep(self.retry_policy.backoff(attempt))
+                continue
+            except BaseException:
+                # A canceled call says nothing about the agent's health, but
+                # it must not hold on to the half-open trial.
+                if self.circuit_breaker is not None:
+                    self.circuit_breaker.release_trial()
+                raise
+
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.record_success()
+            return body
+
+    async def _post_hedged(
+        self, method: str, payload: Any, timeout: float | None
+    ) -> dict[str, Any] | list[dict[str, Any]]:
+        """Posts the payload, sending hedged copies if it is slow to return."""
+        delay = (
+            None
+            if self.hedging_policy is None
+            else self.hedging_policy.delay(method, self.stats)
+        )
+        if delay is None:
+            return await self._post(method, payload, timeout)
+
+        attempts = [asyncio.create_task(self._post(method, payload, timeout))]
+        try:
+            pending = set(attempts)
+            while True:
+                can_hedge = len(attempts) <= self.hedging_policy.max_hedges
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=delay if can_hedge else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for attempt in done:
+                    if attempt.exception() is None:
+                        return attempt.result()
+                if not pending and not can_hedge:
+                    # Every attempt failed; report the last error.
+                    return attempts[-1].result()
+                if can_hedge:
+                    self.stats.hedges += 1
+                    hedge = asyncio.create_task(self._post(method, payload, timeout))
+                    attempts.append(hedge)
+                    pending.add(hedge)
+        finally:
+            for attempt in attempts:
+                attempt.cancel()
+
+    async def _post(
+        self, method: str, payload: Any, timeout: float | None
+    ) -> dict[str, Any] | list[dict[str, Any]]:
+        started = time.monotonic()
+        try:
+            response = await self._client.post(
+                self.url,
+                json=payload,
+                timeout=httpx.USE_CLIENT_DEFAULT if timeout is None else timeout,
+            )
+            response.raise_for_status()
+            body = response.json()
+        except httpx.HTTPStatusError as e:
+            self.stats.record(method, time.monotonic() - started, error=True)
+            raise A2AClientHTTPError(e.response.status_code, str(e)) from e
+        except json.JSONDecodeError as e:
+            self.stats.record(method, time.monotonic() - started, error=True)
+            raise A2AClientJSONError(str(e)) from e
+        except httpx.RequestError:
+            self.stats.record(method, time.monotonic() - started, error=True)
+            raise
+
+        self.stats.record(method, time.monotonic() - started, error=False)
+        return body
+
+    async def get_task(
+        self, payload: dict[str, Any], timeout: float | None = None
+    ) -> GetTaskResponse:
         request = GetTaskRequest(params=payload)
-        return GetTaskResponse(**await self._send_request(request))
+        return GetTaskResponse(**await self._send_request(request, timeout))
 
-    async def cancel_task(self, payload: dict[str, Any]) -> CancelTaskResponse:
+    async def cancel_task(
+        self, payload: dict[str, Any], timeout: float | None = None
+    ) -> CancelTaskResponse:
         request = CancelTaskRequest(params=payload)
-        return CancelTaskResponse(**await self._send_request(request))
+        return CancelTaskResponse(**await self._send_request(request, timeout))
 
     async def set_task_callback(
-        self, payload: dict[str, Any]
+        self, payload: dict[str, Any], timeout: float | None = None
     ) -> SetTaskPushNotificationResponse:
         request = SetTaskPushNotificationRequest(params=payload)
-        return SetTaskPushNotificationResponse(**await self._send_request(request))
+        return SetTaskPushNotificationResponse(
+            **await self._send_request(request, timeout)
+        )
 
     async def get_task_callback(
-        self, payload: dict[str, Any]
+        self, payload: dict[str, Any], timeout: float | None = None
     ) -> GetTaskPushNotificationResponse:
         request = GetTaskPushNotificationRequest(params=payload)
-        return GetTaskPushNotificationResponse(**await self._send_request(request))
+        return GetTaskPushNotificationResponse(
+            **await self._send_request(request, timeout)
+        )
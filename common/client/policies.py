@@ -0,0 +1,181 @@
+from collections import deque
+from common.types import A2AClientCircuitOpenError, A2AClientHTTPError
+from typing import Any
+import httpx
+import math
+import random
+import time
+
+# Methods that can be sent again without side effects.
+IDEMPOTENT_METHODS = {"tasks/get", "tasks/pushNotification/get"}
+
+
+class RetryPolicy:
+    """Retries failed idempotent calls with jittered exponential backoff.
+
+    Only transport errors and the given HTTP status codes are retried, and
+    only for methods in `methods`, which should all be idempotent: a task
+    sent twice would run twice.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        initial_backoff: float = 0.1,
+        max_backoff: float = 2.0,
+        methods: set[str] | None = None,
+        retry_status_codes: set[int] | None = None,
+    ):
+        self.max_attempts = max_attempts
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.methods = methods if methods is not None else IDEMPOTENT_METHODS
+        self.retry_status_codes = retry_status_codes or {429, 502, 503, 504}
+
+    def should_retry(self, method: str, error: Exception, attempt: int) -> bool:
+        """Whether to retry after `attempt` attempts (counting from 1) failed."""
+        if attempt >= self.max_attempts or method not in self.methods:
+            return False
+        if isinstance(error, A2AClientHTTPError):
+            return error.status_code in self.retry_status_codes
+        return isinstance(error, httpx.TransportError)
+
+    def backoff(self, attempt: int) -> float:
+        # Full jitter spreads out the retries of concurrent callers.
+        return random.uniform(0, min(self.initial_backoff * 2 ** (attempt - 1), self.max_backoff))
+
+
+class HedgingPolicy:
+    """Sends a second copy of a slow idempotent call.
+
+    When a call has not returned after the `percentile` latency seen so far
+    for its method (but at least `min_delay` seconds), another copy is sent
+    and the first response wins. Hedging starts once `min_samples` latencies
+    of the method are known.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 0.95,
+        min_delay: float = 0.05,
+        max_hedges: int = 1,
+        min_samples: int = 20,
+        methods: set[str] | None = None,
+    ):
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.max_hedges = max_hedges
+        self.min_samples = min_samples
+        self.methods = methods if methods is not None else IDEMPOTENT_METHODS
+
+    def delay(self, method: str, stats: "ClientStats") -> float | None:
+        """Returns how long to wait before hedging, or None to not hedge."""
+        if method not in self.methods:
+            return None
+        if len(stats.method_latencies.get(method, ())) < self.min_samples:
+            return None
+        return max(stats.latency_percentile(self.percentile, method), self.min_delay)
+
+
+class CircuitBreaker:
+    """Fails calls fast while a remote agent is unhealthy.
+
+    After `failure_threshold` consecutive failures the circuit opens and
+    calls fail immediately with A2AClientCircuitOpenError. Once
+    `reset_timeout` seconds have passed one trial call is let through
+    (half-open); its success closes the circuit and its failure opens it
+    again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+
+    def before_call(self):
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                raise A2AClientCircuitOpenError("Circuit is open, remote agent is unhealthy")
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN:
+            if self._trial_in_flight:
+                raise A2AClientCircuitOpenError("Circuit is half-open, trial call in flight")
+            self._trial_in_flight = True
+
+    def release_trial(self):
+        """Ends a call that neither succeeded nor failed, e.g. when canceled."""
+        self._trial_in_flight = False
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        self._trial_in_flight = False
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+
+class ClientStats:
+    """Latency and error statistics of the calls to one remote agent.
+
+    Latencies are kept both overall and per method, since a long agent run
+    in tasks/send has nothing in common with a quick tasks/get.
+    """
+
+    def __init__(self, window: int = 500):
+        self.window = window
+        self.latencies: deque[float] = deque(maxlen=window)
+        self.method_latencies: dict[str, deque[float]] = {}
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.hedges = 0
+
+    def record(self, method: str, latency: float, error: bool):
+        self.requests += 1
+        if error:
+            self.errors += 1
+            return
+        self.latencies.append(latency)
+        if method not in self.method_latencies:
+            self.method_latencies[method] = deque(maxlen=self.window)
+        self.method_latencies[method].append(latency)
+
+    def latency_percentile(self, percentile: float, method: str | None = None) -> float:
+        """The latency percentile of all calls, or of the calls to `method`."""
+        latencies = self.latencies if method is None else self.method_latencies.get(method)
+        if not latencies:
+            return 0.0
+        ordered = sorted(latencies)
+        index = min(math.ceil(percentile * len(ordered)) - 1, len(ordered) - 1)
+        return ordered[max(index, 0)]
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "error_rate": self.errors / self.requests if self.requests else 0.0,
+            "retries": self.retries,
+            "hedges": self.hedges,
+            "latency_p50": self.latency_percentile(0.5),
+            "latency_p95": self.latency_percentile(0.95),
+            "latency_p99": self.latency_percentile(0.99),
+            "methods": {
+                method: {
+                    "latency_p50": self.latency_percentile(0.5, method),
+                    "latency_p95": self.latency_percentile(0.95, method),
+                }
+                for method in self.method_latencies
+            },
+        }
@@ -1,4 +1,14 @@
 from .server import A2AServer
 from .task_manager import TaskManager, InMemoryTaskManager
+from .task_store import TaskStore, InMemoryTaskStore, SqliteTaskStore
+from .retention import TaskRetentionPolicy
 
-__all__ = ["A2AServer", "TaskManager", "InMemoryTaskManager"]
+__all__ = [
+    "A2AServer",
+    "TaskManager",
+    "InMemoryTaskManager",
+    "TaskStore",
+    "InMemoryTaskStore",
+    "SqliteTaskStore",
+    "TaskRetentionPolicy",
+]
@@ -0,0 +1,28 @@
+"""JSON encoding helpers used by the A2A server."""
+
+from typing import Any
+from pydantic import BaseModel
+import json
+
+
+def encode_model(model: BaseModel) -> bytes:
+    """Serializes a model to compact JSON bytes, leaving out None values."""
+    return model.__pydantic_serializer__.to_json(model, exclude_none=True)
+
+
+class JSONCodec:
+    """Encodes and decodes JSON bodies straight from and to bytes.
+
+    Pydantic models are serialized by pydantic-core, which writes JSON bytes
+    in a single pass. Bodies that cannot be validated in one pass, such as
+    batches and invalid requests, are decoded with json.loads.
+    """
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data)
+
+    def encode_model(self, model: BaseModel) -> bytes:
+        return encode_model(model)
+
+    def encode_models(self, models: list[BaseModel]) -> bytes:
+        return b"[" + b",".join(self.encode_model(model) for model in models) + b"]"
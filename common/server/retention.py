@@ -0,0 +1,70 @@
+from collections import OrderedDict
+from pydantic import BaseModel
+import time
+
+
+class TaskRetentionPolicy(BaseModel):
+    """Limits on how long finished tasks are kept.
+
+    Only tasks in a terminal state (completed, canceled, failed) are evicted.
+    `max_tasks` caps all resident tasks, `max_bytes` caps the serialized size
+    of terminal tasks and `ttl` is measured in seconds from the moment a task
+    reached its terminal state. A limit set to None is not enforced.
+    """
+
+    max_tasks: int | None = None
+    max_bytes: int | None = None
+    ttl: float | None = None
+    sweep_interval: float = 60.0
+
+
+class TerminalTaskTracker:
+    """Tracks terminal tasks in least-recently-used order."""
+
+    def __init__(self):
+        self.tasks: OrderedDict[str, tuple[float, int]] = OrderedDict()
+        self.total_bytes = 0
+
+    def record(self, task_id: str, size: int, age: float = 0.0):
+        """Records a task that reached its terminal state `age` seconds ago."""
+        self.discard(task_id)
+        self.tasks[task_id] = (time.monotonic() - age, size)
+        self.total_bytes += size
+
+    def touch(self, task_id: str):
+        if task_id in self.tasks:
+            self.tasks.move_to_end(task_id)
+
+    def discard(self, task_id: str):
+        entry = self.tasks.pop(task_id, None)
+        if entry is not None:
+            self.total_bytes -= entry[1]
+
+    def select_evictions(
+        self, policy: TaskRetentionPolicy, resident_tasks: int
+    ) -> list[str]:
+        """Returns the terminal tasks to evict, least recently used first."""
+        selected: list[str] = []
+        remaining_bytes = self.total_bytes
+
+        if policy.ttl is not None:
+            expires_before = time.monotonic() - policy.ttl
+            for task_id, (finished_at, size) in self.tasks.items():
+                if finished_at < expires_before:
+                    selected.append(task_id)
+                    remaining_bytes -= size
+
+        expired = set(selected)
+        candidates = (task_id for task_id in self.tasks if task_id not in expired)
+        for task_id in candidates:
+            over_count = (
+                policy.max_tasks is not None
+                and resident_tasks - len(selected) > policy.max_tasks
+            )
+            over_bytes = policy.max_bytes is not None and remaining_bytes > policy.max_bytes
+            if not over_count and not over_bytes:
+                break
+            selected.append(task_id)
+            remaining_bytes -= self.tasks[task_id][1]
+
+        return selected
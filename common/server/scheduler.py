@@ -0,0 +1,135 @@
+from typing import Any, Coroutine
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PRIORITY_CLASSES = {"high": 0, "normal": 1, "low": 2}
+
+
+class SchedulerBusyError(Exception):
+    """Raised when an execution cannot be admitted because the queue is full."""
+
+    pass
+
+
+class ExecutionTicket:
+    """An admitted execution, either running or waiting for a slot."""
+
+    def __init__(self, priority: int, future: asyncio.Future):
+        self.priority = priority
+        self.future = future
+        self.enqueued_at = time.monotonic()
+
+
+class ExecutionScheduler:
+    """Bounds concurrent agent executions and queues the excess by priority.
+
+    At most `max_concurrency` executions run at once and at most
+    `max_queue_size` wait for a slot; beyond that `admit` fails fast. Lower
+    priority values run first and ties are served in arrival order. The
+    priority class of a task is read from its metadata (`priority` key).
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        max_queue_size: int = 64,
+        priority_classes: dict[str, int] | None = None,
+        default_priority_class: str = "normal",
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_queue_size = max_queue_size
+        self.priority_classes = priority_classes or DEFAULT_PRIORITY_CLASSES
+        self.default_priority = self.priority_classes[default_priority_class]
+        self.running = 0
+        self._waiting: list[tuple[int, int, ExecutionTicket]] = []
+        self._sequence = itertools.count()
+        self.admitted_count = 0
+        self.rejected_count = 0
+        self.started_count = 0
+        self.total_wait_time = 0.0
+        self.max_wait_time = 0.0
+
+    def priority_of(self, metadata: dict[str, Any] | None) -> int:
+        if not metadata or metadata.get("priority") is None:
+            return self.default_priority
+        return self.priority_classes.get(metadata["priority"], self.default_priority)
+
+    def admit(self, priority: int | None = None) -> ExecutionTicket:
+        """Reserves a slot or a place in the queue, raising SchedulerBusyError if full."""
+        if priority is None:
+            priority = self.default_priority
+
+        future = asyncio.get_running_loop().create_future()
+        ticket = ExecutionTicket(priority, future)
+        if self.running < self.max_concurrency and not self._waiting:
+            self.running += 1
+            self._record_start(ticket)
+        elif len(self._waiting) >= self.max_queue_size:
+            self.rejected_count += 1
+            logger.warning(
+                f"Rejecting execution: {self.running} running, {len(self._waiting)} queued"
+            )
+            raise SchedulerBusyError("Agent execution queue is full")
+        else:
+            heapq.heappush(self._waiting, (priority, next(self._sequence), ticket))
+
+        self.admitted_count += 1
+        return ticket
+
+    async def run(self, ticket: ExecutionTicket, coro: Coroutine[Any, Any, Any]) -> Any:
+        """Waits for the ticket's slot and runs `coro`.
+
+        The slot is not freed here: the caller must discard the ticket once
+        the execution is over, including when it is canceled before it
+        starts (see InMemoryTaskManager.start_execution).
+        """
+        await ticket.future
+        return await coro
+
+    def discard(self, ticket: ExecutionTicket):
+        """Frees the ticket's slot or its place in the queue.
+
+        Call it exactly once per admitted ticket, when its execution is over
+        or will not run.
+        """
+        if ticket.future.done() and not ticket.future.cancelled():
+            # The slot was already granted.
+            self._release()
+        else:
+            ticket.future.cancel()
+            self._waiting = [entry for entry in self._waiting if entry[2] is not ticket]
+            heapq.heapify(self._waiting)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "running": self.running,
+            "queued": len(self._waiting),
+            "max_concurrency": self.max_concurrency,
+            "max_queue_size": self.max_queue_size,
+            "admitted": self.admitted_count,
+            "rejected": self.rejected_count,
+            "avg_wait_seconds": self.total_wait_time / self.started_count
+            if self.started_count
+            else 0.0,
+            "max_wait_seconds": self.max_wait_time,
+        }
+
+    def _release(self):
+        while self._waiting:
+            _, _, ticket = heapq.heappop(self._waiting)
+            if not ticket.future.cancelled():
+                self._record_start(ticket)
+                return
+        self.running -= 1
+
+    def _record_start(self, ticket: ExecutionTicket):
+        wait_time = time.monotonic() - ticket.enqueued_at
+        self.started_count += 1
+        self.total_wait_time += wait_time
+        self.max_wait_time = max(self.max_wait_time, wait_time)
+        ticket.future.set_result(wait_time)
@@ -1,11 +1,12 @@
 from starlette.applications import Starlette
-from starlette.responses import JSONResponse
+from starlette.responses import Response
 from sse_starlette.sse import EventSourceResponse
 from starlette.requests import Request
 from common.types import (
-    A2ARequest,
+    JSONRPCRequest,
     JSONRPCResponse,
     InvalidRequestError,
+    MethodNotFoundError,
     JSONParseError,
     GetTaskRequest,
     CancelTaskRequest,
@@ -17,15 +18,60 @@ from common.types import (
     TaskResubscriptionRequest,
     SendTaskStreamingRequest,
 )
-from pydantic import ValidationError
+from pydantic import Field, TypeAdapter, ValidationError
+from contextlib import asynccontextmanager
+import asyncio
+import hashlib
 import json
-from typing import AsyncIterable, Any
+from typing import (
+    Annotated,
+    AsyncIterable,
+    Any,
+    Awaitable,
+    Callable,
+    Literal,
+    NamedTuple,
+    Union,
+    get_origin,
+)
+from common.server.codec import JSONCodec
+from common.server.streaming import TaskStreamEvent
 from common.server.task_manager import TaskManager
 
 import logging
 
 logger = logging.getLogger(__name__)
 
+STREAMING_METHODS = {"tasks/sendSubscribe", "tasks/resubscribe"}
+
+MethodHandler = Callable[[JSONRPCRequest], Awaitable[JSONRPCResponse | AsyncIterable[Any]]]
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    # Weak comparison, as If-None-Match requires.
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+class RegisteredMethod(NamedTuple):
+    request_type: type[JSONRPCRequest]
+    adapter: TypeAdapter
+    handler: MethodHandler
+
+
+# Built-in A2A methods and the TaskManager handler each one is routed to.
+TASK_MANAGER_METHODS: dict[type[JSONRPCRequest], str] = {
+    GetTaskRequest: "on_get_task",
+    SendTaskRequest: "on_send_task",
+    SendTaskStreamingRequest: "on_send_task_subscribe",
+    CancelTaskRequest: "on_cancel_task",
+    SetTaskPushNotificationRequest: "on_set_task_push_notification",
+    GetTaskPushNotificationRequest: "on_get_task_push_notification",
+    TaskResubscriptionRequest: "on_resubscribe_to_task",
+}
+
 
 class A2AServer:
     def __init__(
@@ -35,18 +81,44 @@ class A2AServer:
         endpoint="/",
         agent_card: AgentCard = None,
         task_manager: TaskManager = None,
+        batch_concurrency: int = 10,
+        card_max_age: int = 300,
     ):
         self.host = host
         self.port = port
         self.endpoint = endpoint
         self.task_manager = task_manager
         self.agent_card = agent_card
-        self.app = Starlette()
+        # Maximum number of requests from a single JSON-RPC batch that are
+        # dispatched to the task manager at the same time.
+        self.batch_concurrency = batch_concurrency
+        self.codec = JSONCodec()
+        # Seconds clients may reuse the agent card before revalidating it.
+        self.card_max_age = card_max_age
+        self._card_source: AgentCard | None = None
+        self._card_body = b""
+        self._card_etag = ""
+        self.methods: dict[str, RegisteredMethod] = {}
+        self._request_adapter: TypeAdapter | None = None
+        for request_type, handler_name in TASK_MANAGER_METHODS.items():
+            self.register_method(
+                request_type,
+                lambda request, name=handler_name: getattr(self.task_manager, name)(request),
+            )
+        self.app = Starlette(lifespan=self._lifespan)
         self.app.add_route(self.endpoint, self._process_request, methods=["POST"])
         self.app.add_route(
             "/.well-known/agent.json", self._get_agent_card, methods=["GET"]
         )
 
+    @asynccontextmanager
+    async def _lifespan(self, app: Starlette):
+        if self.task_manager is not None:
+            await self.task_manager.start()
+        yield
+        if self.task_manager is not None:
+            await self.task_manager.stop()
+
     def start(self):
         if self.agent_card is None:
             raise ValueError("agent_card is not defined")
@@ -58,42 +130,155 @@ class A2AServer:
 
         uvicorn.run(self.app, host=self.host, port=self.port)
 
-    def _get_agent_card(self, request: Request) -> JSONResponse:
-        return JSONResponse(self.agent_card.model_dump(exclude_none=True))
+    def register_method(self, request_type: type[JSONRPCRequest], handler: MethodHandler):
+        """Routes a JSON-RPC method to `handler`.
+
+        `request_type.method` must be a Literal with the method name as its
+        default, and incoming requests for it are validated against
+        `request_type` only. Registering an existing method replaces its handler.
+        """
+        method_field = request_type.model_fields["method"]
+        if get_origin(method_field.annotation) is not Literal or not isinstance(
+            method_field.default, str
+        ):
+            raise ValueError(
+                f"{request_type.__name__}.method must be a Literal with a default"
+            )
+
+        self.methods[method_field.default] = RegisteredMethod(
+            request_type, TypeAdapter(request_type), handler
+        )
+        self._request_adapter = None
+
+    def _get_agent_card(self, request: Request) -> Response:
+        if self.agent_card is not self._card_source:
+            # Serialize the card once; it is only re-encoded when replaced.
+            self._card_body = self.codec.encode_model(self.agent_card)
+            self._card_etag = f'"{hashlib.sha256(self._card_body).hexdigest()}"'
+            self._card_source = self.agent_card
+
+        headers = {
+            "ETag": self._card_etag,
+            "Cache-Control": f"public, max-age={self.card_max_age}",
+        }
+        if etag_matches(request.headers.get("if-none-match"), self._card_etag):
+            return Response(status_code=304, headers=headers)
+        return Response(
+            self._card_body, media_type="application/json", headers=headers
+        )
+
+    def _get_request_adapter(self) -> TypeAdapter:
+        """Returns a validator for any registered request, discriminated on `method`."""
+        if self._request_adapter is None:
+            request_types = tuple(m.request_type for m in self.methods.values())
+            if len(request_types) == 1:
+                self._request_adapter = TypeAdapter(request_types[0])
+            else:
+                self._request_adapter = TypeAdapter(
+                    Annotated[Union[request_types], Field(discriminator="method")]
+                )
+        return self._request_adapter
 
     async def _process_request(self, request: Request):
         try:
-            body = await request.json()
-            json_rpc_request = A2ARequest.validate_python(body)
-
-            if isinstance(json_rpc_request, GetTaskRequest):
-                result = await self.task_manager.on_get_task(json_rpc_request)
-            elif isinstance(json_rpc_request, SendTaskRequest):
-                result = await self.task_manager.on_send_task(json_rpc_request)
-            elif isinstance(json_rpc_request, SendTaskStreamingRequest):
-                result = await self.task_manager.on_send_task_subscribe(
-                    json_rpc_request
-                )
-            elif isinstance(json_rpc_request, CancelTaskRequest):
-                result = await self.task_manager.on_cancel_task(json_rpc_request)
-            elif isinstance(json_rpc_request, SetTaskPushNotificationRequest):
-                result = await self.task_manager.on_set_task_push_notification(json_rpc_request)
-            elif isinstance(json_rpc_request, GetTaskPushNotificationRequest):
-                result = await self.task_manager.on_get_task_push_notification(json_rpc_request)
-            elif isinstance(json_rpc_request, TaskResubscriptionRequest):
-                result = await self.task_manager.on_resubscribe_to_task(
-                    json_rpc_request
-                )
-            else:
-                logger.warning(f"Unexpected request type: {type(json_rpc_request)}")
-                raise ValueError(f"Unexpected request type: {type(request)}")
+            raw_body = await request.body()
+            if raw_body.lstrip()[:1] == b"[":
+                return await self._process_batch(self.codec.loads(raw_body))
+
+            try:
+                # Fast path: validate straight from the raw bytes.
+                json_rpc_request = self._get_request_adapter().validate_json(raw_body)
+            except ValidationError:
+                # Decode and route the slow way to report the precise error,
+                # including the request id when there is one.
+                json_rpc_request = self._parse(self.codec.loads(raw_body))
+                if isinstance(json_rpc_request, JSONRPCResponse):
+                    # Invalid requests are answered with 400, as they always were.
+                    return self._json_response(json_rpc_request, status_code=400)
 
+            result = await self._invoke(json_rpc_request, request)
             return self._create_response(result)
 
         except Exception as e:
             return self._handle_exception(e)
 
-    def _handle_exception(self, e: Exception) -> JSONResponse:
+    async def _dispatch(self, body: Any) -> JSONRPCResponse | AsyncIterable[Any]:
+        json_rpc_request = self._parse(body)
+        if isinstance(json_rpc_request, JSONRPCResponse):
+            return json_rpc_request
+        return await self._invoke(json_rpc_request)
+
+    def _parse(self, body: Any) -> JSONRPCRequest | JSONRPCResponse:
+        """Validates a decoded request, or returns the error response for it."""
+        if not isinstance(body, dict) or not isinstance(body.get("method"), str):
+            return JSONRPCResponse(id=None, error=InvalidRequestError())
+
+        registered = self.methods.get(body["method"])
+        if registered is None:
+            logger.warning(f"Unexpected method: {body['method']}")
+            return JSONRPCResponse(id=body.get("id"), error=MethodNotFoundError())
+
+        try:
+            return registered.adapter.validate_python(body)
+        except ValidationError as e:
+            response = self._error_response(e)
+            response.id = body.get("id")
+            return response
+
+    async def _invoke(
+        self, json_rpc_request: JSONRPCRequest, http_request: Request | None = None
+    ) -> JSONRPCResponse | AsyncIterable[Any]:
+        if (
+            http_request is not None
+            and isinstance(json_rpc_request, TaskResubscriptionRequest)
+            and json_rpc_request.params.lastEventId is None
+        ):
+            # Browsers' EventSource reconnects with the standard SSE header.
+            last_event_id = http_request.headers.get("Last-Event-ID", "")
+            if last_event_id.isdigit():
+                json_rpc_request.params.lastEventId = int(last_event_id)
+
+        handler = self.methods[json_rpc_request.method].handler
+        return await handler(json_rpc_request)
+
+    async def _process_batch(self, batch: list[Any]) -> Response:
+        """Dispatches a JSON-RPC 2.0 batch and returns all responses in one body.
+
+        Requests are run concurrently, bounded by `batch_concurrency`. Streaming
+        methods cannot be answered inside a batch and are rejected per entry.
+        """
+        if len(batch) == 0:
+            response = JSONRPCResponse(id=None, error=InvalidRequestError())
+            return self._json_response(response, status_code=400)
+
+        semaphore = asyncio.Semaphore(self.batch_concurrency)
+
+        async def run(body: Any) -> JSONRPCResponse:
+            request_id = body.get("id") if isinstance(body, dict) else None
+            async with semaphore:
+                try:
+                    if isinstance(body, dict) and body.get("method") in STREAMING_METHODS:
+                        return JSONRPCResponse(
+                            id=request_id,
+                            error=InvalidRequestError(
+                                message="Streaming methods are not allowed in a batch"
+                            ),
+                        )
+                    result = await self._dispatch(body)
+                    if not isinstance(result, JSONRPCResponse):
+                        raise ValueError(f"Unexpected result type: {type(result)}")
+                    return result
+                except Exception as e:
+                    response = self._error_response(e)
+                    response.id = request_id
+                    return response
+
+        responses = await asyncio.gather(*(run(body) for body in batch))
+        return Response(
+            self.codec.encode_models(responses), media_type="application/json"
+        )
+
+    def _error_response(self, e: Exception) -> JSONRPCResponse:
         if isinstance(e, json.decoder.JSONDecodeError):
             json_rpc_error = JSONParseError()
         elif isinstance(e, ValidationError):
@@ -102,19 +287,32 @@ class A2AServer:
             logger.error(f"Unhandled exception: {e}")
             json_rpc_error = InternalError()
 
-        response = JSONRPCResponse(id=None, error=json_rpc_error)
-        return JSONResponse(response.model_dump(exclude_none=True), status_code=400)
+        return JSONRPCResponse(id=None, error=json_rpc_error)
+
+    def _handle_exception(self, e: Exception) -> Response:
+        response = self._error_response(e)
+        return self._json_response(response, status_code=400)
+
+    def _json_response(self, model: Any, status_code: int = 200) -> Response:
+        return Response(
+            self.codec.encode_model(model),
+            status_code=status_code,
+            media_type="application/json",
+        )
 
-    def _create_response(self, result: Any) -> JSONResponse | EventSourceResponse:
+    def _create_response(self, result: Any) -> Response | EventSourceResponse:
         if isinstance(result, AsyncIterable):
 
             async def event_generator(result) -> AsyncIterable[dict[str, str]]:
                 async for item in result:
-                    yield {"data": item.model_dump_json(exclude_none=True)}
+                    if isinstance(item, TaskStreamEvent):
+                        yield {"id": str(item.id), "data": item.data.decode()}
+                    else:
+                        yield {"data": self.codec.encode_model(item).decode()}
 
             return EventSourceResponse(event_generator(result))
         elif isinstance(result, JSONRPCResponse):
-            return JSONResponse(result.model_dump(exclude_none=True))
+            return self._json_response(result)
         else:
             logger.error(f"Unexpected result type: {type(result)}")
             raise ValueError(f"Unexpected result type: {type(result)}")
@@ -0,0 +1,174 @@
+from collections import deque
+from enum import Enum
+from typing import Any, NamedTuple
+from common.server.codec import encode_model
+from common.types import (
+    JSONRPCError,
+    TaskArtifactUpdateEvent,
+    TaskStatusUpdateEvent,
+)
+import asyncio
+import json
+
+TaskEvent = TaskStatusUpdateEvent | TaskArtifactUpdateEvent | JSONRPCError
+
+
+class JournaledEvent(NamedTuple):
+    """A streamed event with its id and its JSON encoding.
+
+    The event is encoded once when it is journaled and the bytes are shared by
+    every subscriber; only the JSON-RPC request id differs between them.
+    """
+
+    id: int
+    event: TaskEvent
+    payload: bytes
+
+    def encode_response(self, response_prefix: bytes) -> bytes:
+        """Builds the SendTaskStreamingResponse JSON for one subscriber."""
+        member = b'"error":' if isinstance(self.event, JSONRPCError) else b'"result":'
+        return response_prefix + member + self.payload + b"}"
+
+
+class TaskStreamEvent(NamedTuple):
+    """An encoded streaming response together with its SSE event id."""
+
+    id: int
+    data: bytes
+
+
+def streaming_response_prefix(request_id: Any) -> bytes:
+    """Opens a SendTaskStreamingResponse object for `request_id`.
+
+    Matches the model's own serialization, which omits a None id.
+    """
+    if request_id is None:
+        return b'{"jsonrpc":"2.0",'
+    return b'{"jsonrpc":"2.0","id":' + json.dumps(request_id).encode() + b","
+
+
+def is_final_event(event: TaskEvent) -> bool:
+    return isinstance(event, JSONRPCError) or (
+        isinstance(event, TaskStatusUpdateEvent) and event.final
+    )
+
+
+def is_status_update(event: TaskEvent) -> bool:
+    """Whether the event is a status update that later ones supersede."""
+    return isinstance(event, TaskStatusUpdateEvent) and not event.final
+
+
+class TaskEventJournal:
+    """Bounded log of the events streamed for one task.
+
+    Event ids increase monotonically for the lifetime of the task, so a client
+    that reconnects can ask for everything after the last id it has seen.
+    """
+
+    def __init__(self, max_events: int):
+        self.events: deque[JournaledEvent] = deque(maxlen=max_events)
+        self.next_id = 1
+        self.closed = False
+
+    def append(self, event: TaskEvent) -> JournaledEvent:
+        entry = JournaledEvent(self.next_id, event, encode_model(event))
+        self.next_id += 1
+        self.events.append(entry)
+        self.closed = is_final_event(event)
+        return entry
+
+    def replay(self, last_event_id: int | None) -> list[JournaledEvent]:
+        """Returns the retained events after `last_event_id`.
+
+        A closed journal always ends the replay with its final event, so that a
+        client reconnecting after the stream finished still gets a final event.
+        """
+        if last_event_id is None:
+            entries = []
+        else:
+            entries = [entry for entry in self.events if entry.id > last_event_id]
+
+        if self.closed and not entries and self.events:
+            entries = [self.events[-1]]
+        return entries
+
+    def is_missing_events(self, last_event_id: int | None) -> bool:
+        """Whether events after `last_event_id` were dropped from the journal."""
+        return (
+            last_event_id is not None
+            and len(self.events) > 0
+            and self.events[0].id > last_event_id + 1
+        )
+
+
+class SlowConsumerPolicy(str, Enum):
+    """What to do when a subscriber's queue is full."""
+
+    DROP_OLDEST = "drop-oldest"
+    COALESCE = "coalesce"
+    DISCONNECT = "disconnect"
+
+
+class SSESubscriber:
+    """Bounded queue of journaled events for one SSE client.
+
+    `offer` never blocks, so fanning out to a stalled client cannot hold up
+    the others. When the queue is full the policy decides between dropping
+    the oldest queued event, dropping queued intermediate status updates in
+    favour of the newest one, or disconnecting the subscriber. A disconnected
+    subscriber still receives what it had queued and can resubscribe from its
+    last event id.
+    """
+
+    def __init__(self, max_size: int, policy: SlowConsumerPolicy):
+        self.events: deque[JournaledEvent] = deque()
+        self.max_size = max_size
+        self.policy = policy
+        self.disconnected = False
+        self._ready = asyncio.Event()
+
+    def preload(self, entries: list[JournaledEvent]):
+        """Queues replayed events, ignoring the size limit."""
+        self.events.extend(entries)
+        self._ready.set()
+
+    def offer(self, entry: JournaledEvent) -> bool:
+        if self.disconnected:
+            return False
+
+        if self.max_size > 0 and len(self.events) >= self.max_size:
+            if self.policy == SlowConsumerPolicy.DROP_OLDEST:
+                self.events.popleft()
+            elif not (self.policy == SlowConsumerPolicy.COALESCE and self._coalesce(entry)):
+                self.disconnected = True
+                self._ready.set()
+                return False
+
+        self.events.append(entry)
+        self._ready.set()
+        return True
+
+    async def get(self) -> JournaledEvent | None:
+        """Returns the next event, or None once a disconnected queue is drained."""
+        while not self.events:
+            if self.disconnected:
+                return None
+            self._ready.clear()
+            await self._ready.wait()
+        return self.events.popleft()
+
+    def _coalesce(self, incoming: JournaledEvent) -> bool:
+        """Drops queued non-final status updates superseded by a newer one.
+
+        The latest status update is kept, unless `incoming` is itself a
+        status update that replaces it.
+        """
+        statuses = [entry for entry in self.events if is_status_update(entry.event)]
+        if not is_status_update(incoming.event):
+            statuses = statuses[:-1]
+        if not statuses:
+            return False
+        superseded = {id(entry) for entry in statuses}
+        self.events = deque(entry for entry in self.events if id(entry) not in superseded)
+        return True
+
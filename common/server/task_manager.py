@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Union, AsyncIterable, List
+from typing import Any, Coroutine, Union, AsyncIterable, List
 from common.types import Task
 from common.types import (
     JSONRPCResponse,
@@ -27,17 +27,41 @@ from common.types import (
     Artifact,
     PushNotificationConfig,
     TaskStatusUpdateEvent,
-    JSONRPCError,
     TaskPushNotificationConfig,
     InternalError,
+    SlowSubscriberError,
 )
+from common.server.streaming import (
+    JournaledEvent,
+    SlowConsumerPolicy,
+    SSESubscriber,
+    TaskEventJournal,
+    TaskStreamEvent,
+    is_final_event,
+    streaming_response_prefix,
+)
+from common.server.codec import encode_model
+from common.server.scheduler import ExecutionScheduler, ExecutionTicket
+from common.server.retention import TaskRetentionPolicy, TerminalTaskTracker
+from common.server.task_store import TaskStore, InMemoryTaskStore
 from common.server.utils import new_not_implemented_error
 import asyncio
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
+TERMINAL_STATES = {TaskState.COMPLETED, TaskState.CANCELED, TaskState.FAILED}
+
 class TaskManager(ABC):
+    async def start(self):
+        """Called once when the server starts, before any request."""
+        pass
+
+    async def stop(self):
+        """Called once when the server shuts down, after the last request."""
+        pass
+
     @abstractmethod
     async def on_get_task(self, request: GetTaskRequest) -> GetTaskResponse:
         pass
@@ -76,22 +100,68 @@ class TaskManager(ABC):
 
 
 class InMemoryTaskManager(TaskManager):
-    def __init__(self):
-        self.tasks: dict[str, Task] = {}
-        self.push_notification_infos: dict[str, PushNotificationConfig] = {}
-        self.lock = asyncio.Lock()
-        self.task_sse_subscribers: dict[str, List[asyncio.Queue]] = {}
-        self.subscriber_lock = asyncio.Lock()
+    def __init__(
+        self,
+        task_store: TaskStore | None = None,
+        lock_stripes: int = 64,
+        retention_policy: TaskRetentionPolicy | None = None,
+        event_journal_size: int = 100,
+        event_journal_ttl: float = 300.0,
+        sse_queue_size: int = 100,
+        slow_consumer_policy: SlowConsumerPolicy = SlowConsumerPolicy.DISCONNECT,
+        scheduler: ExecutionScheduler | None = None,
+    ):
+        self.task_store = task_store if task_store is not None else InMemoryTaskStore()
+        self.retention_policy = retention_policy
+        self.terminal_tasks = TerminalTaskTracker()
+        self.evicted_task_count = 0
+        self._retention_sweeper: asyncio.Task | None = None
+        # Locks are striped by task id so that unrelated tasks rarely contend.
+        self.task_locks = [asyncio.Lock() for _ in range(lock_stripes)]
+        self.task_sse_subscribers: dict[str, List[SSESubscriber]] = {}
+        self.sse_queue_size = sse_queue_size
+        self.slow_consumer_policy = slow_consumer_policy
+        self.subscriber_locks = [asyncio.Lock() for _ in range(lock_stripes)]
+        # Recent streamed events per task, replayed to clients that resubscribe.
+        self.task_event_journals: dict[str, TaskEventJournal] = {}
+        self.event_journal_size = event_journal_size
+        # A journal is dropped this many seconds after its final event, so
+        # that clients can still resume a stream that just ended.
+        self.event_journal_ttl = event_journal_ttl
+        self._journal_expiries: dict[str, asyncio.TimerHandle] = {}
+        # Agent executions that are still running or queued, by task id.
+        self.running_tasks: dict[str, asyncio.Task] = {}
+        self.scheduler = scheduler
+
+    async def start(self):
+        self._ensure_retention_sweeper()
+
+    async def stop(self):
+        if self._retention_sweeper is not None:
+            self._retention_sweeper.cancel()
+            self._retention_sweeper = None
+        for expiry in self._journal_expiries.values():
+            expiry.cancel()
+        self._journal_expiries.clear()
+        await self.task_store.close()
+
+    def task_lock(self, task_id: str) -> asyncio.Lock:
+        return self.task_locks[hash(task_id) % len(self.task_locks)]
+
+    def subscriber_lock(self, task_id: str) -> asyncio.Lock:
+        return self.subscriber_locks[hash(task_id) % len(self.subscriber_locks)]
 
     async def on_get_task(self, request: GetTaskRequest) -> GetTaskResponse:
         logger.info(f"Getting task {request.params.id}")
         task_query_params: TaskQueryParams = request.params
 
-        async with self.lock:
-            task = self.tasks.get(task_query_params.id)
+        async with self.task_lock(task_query_params.id):
+            task = await self.task_store.get(task_query_params.id)
             if task is None:
                 return GetTaskResponse(id=request.id, error=TaskNotFoundError())
 
+            self.terminal_tasks.touch(task.id)
+
             task_result = self.append_task_history(
                 task, task_query_params.historyLength
             )
@@ -102,12 +172,99 @@ class InMemoryTaskManager(TaskManager):
         logger.info(f"Cancelling task {request.params.id}")
         task_id_params: TaskIdParams = request.params
 
-        async with self.lock:
-            task = self.tasks.get(task_id_params.id)
+        async with self.task_lock(task_id_params.id):
+            task = await self.task_store.get(task_id_params.id)
             if task is None:
                 return CancelTaskResponse(id=request.id, error=TaskNotFoundError())
 
-        return CancelTaskResponse(id=request.id, error=TaskNotCancelableError())
+        if task.status.state in TERMINAL_STATES:
+            return CancelTaskResponse(id=request.id, error=TaskNotCancelableError())
+
+        execution = self.running_tasks.get(task_id_params.id)
+        if execution is not None:
+            execution.cancel()
+            # The execution marks the task as canceled while it unwinds.
+            await asyncio.wait([execution])
+
+        async with self.task_lock(task_id_params.id):
+            task = await self.task_store.get(task_id_params.id)
+        if task is None:
+            return CancelTaskResponse(id=request.id, error=TaskNotFoundError())
+        if task.status.state != TaskState.CANCELED:
+            if task.status.state in TERMINAL_STATES:
+                # The execution finished before it could be canceled.
+                return CancelTaskResponse(id=request.id, error=TaskNotCancelableError())
+            task = await self._mark_canceled(task_id_params.id)
+
+        return CancelTaskResponse(
+            id=request.id, result=self.append_task_history(task, None)
+        )
+
+    def admit_execution(self, metadata: dict[str, Any] | None) -> ExecutionTicket | None:
+        """Reserves room for an agent execution with the scheduler, if any.
+
+        Raises SchedulerBusyError when the scheduler's wait queue is full. The
+        ticket must be passed to start_execution or discarded.
+        """
+        if self.scheduler is None:
+            return None
+        return self.scheduler.admit(self.scheduler.priority_of(metadata))
+
+    def discard_execution(self, ticket: ExecutionTicket | None):
+        """Gives up a ticket from admit_execution that will not be started."""
+        if ticket is not None:
+            self.scheduler.discard(ticket)
+
+    def start_execution(
+        self,
+        task_id: str,
+        coro: Coroutine[Any, Any, Any],
+        ticket: ExecutionTicket | None = None,
+    ) -> asyncio.Task:
+        """Runs an agent execution for the task in the background.
+
+        With a scheduler ticket the execution waits for its slot first. The
+        execution is tracked so that tasks/cancel can stop it, whether queued
+        or running. When it is canceled the task moves to CANCELED and a final
+        event goes out to subscribers and push notification targets.
+        """
+
+        async def run():
+            try:
+                if ticket is not None:
+                    return await self.scheduler.run(ticket, coro)
+                return await coro
+            except asyncio.CancelledError:
+                logger.info(f"Execution of task {task_id} was canceled")
+                await self._mark_canceled(task_id)
+                raise
+
+        execution = asyncio.create_task(run())
+        self.running_tasks[task_id] = execution
+
+        def forget(_):
+            if self.running_tasks.get(task_id) is execution:
+                del self.running_tasks[task_id]
+            # The execution may be canceled before its first step, in which
+            # case neither the coroutine nor the scheduler slot was touched.
+            coro.close()
+            self.discard_execution(ticket)
+
+        execution.add_done_callback(forget)
+        return execution
+
+    async def _mark_canceled(self, task_id: str) -> Task:
+        task_status = TaskStatus(state=TaskState.CANCELED)
+        task = await self.update_store(task_id, task_status, None)
+        await self.send_task_notification(task)
+        await self.enqueue_events_for_sse(
+            task_id, TaskStatusUpdateEvent(id=task_id, status=task_status, final=True)
+        )
+        return task
+
+    async def send_task_notification(self, task: Task):
+        """Pushes a task update to the client. Push notifications are optional."""
+        pass
 
     @abstractmethod
     async def on_send_task(self, request: SendTaskRequest) -> SendTaskResponse:
@@ -120,28 +277,32 @@ class InMemoryTaskManager(TaskManager):
         pass
 
     async def set_push_notification_info(self, task_id: str, notification_config: PushNotificationConfig):
-        async with self.lock:
-            task = self.tasks.get(task_id)
+        async with self.task_lock(task_id):
+            task = await self.task_store.get(task_id)
             if task is None:
                 raise ValueError(f"Task not found for {task_id}")
 
-            self.push_notification_infos[task_id] = notification_config
+            await self.task_store.set_push_notification_config(task_id, notification_config)
 
         return
     
     async def get_push_notification_info(self, task_id: str) -> PushNotificationConfig:
-        async with self.lock:
-            task = self.tasks.get(task_id)
+        async with self.task_lock(task_id):
+            task = await self.task_store.get(task_id)
             if task is None:
                 raise ValueError(f"Task not found for {task_id}")
 
-            return self.push_notification_infos[task_id]
+            notification_config = await self.task_store.get_push_notification_config(task_id)
+            if notification_config is None:
+                raise ValueError(f"Push notification info not found for {task_id}")
+
+            return notification_config
             
         return
     
     async def has_push_notification_info(self, task_id: str) -> bool:
-        async with self.lock:
-            return task_id in self.push_notification_infos
+        async with self.task_lock(task_id):
+            return await self.task_store.get_push_notification_config(task_id) is not None
             
 
     async def on_set_task_push_notification(
@@ -184,8 +345,9 @@ class InMemoryTaskManager(TaskManager):
 
     async def upsert_task(self, task_send_params: TaskSendParams) -> Task:
         logger.info(f"Upserting task {task_send_params.id}")
-        async with self.lock:
-            task = self.tasks.get(task_send_params.id)
+        self._ensure_retention_sweeper()
+        async with self.task_lock(task_send_params.id):
+            task = await self.task_store.get(task_send_params.id)
             if task is None:
                 task = Task(
                     id=task_send_params.id,
@@ -194,9 +356,11 @@ class InMemoryTaskManager(TaskManager):
                     status=TaskStatus(state=TaskState.SUBMITTED),
                     history=[task_send_params.message],
                 )
-                self.tasks[task_send_params.id] = task
+                await self.task_store.upsert(task)
             else:
-                task.history.append(task_send_params.message)
+                task = await self.task_store.append_history(
+                    task_send_params.id, [task_send_params.message]
+                )
 
             return task
 
@@ -206,27 +370,104 @@ class InMemoryTaskManager(TaskManager):
         return new_not_implemented_error(request.id)
 
     async def update_store(
-        self, task_id: str, status: TaskStatus, artifacts: list[Artifact]
+        self, task_id: str, status: TaskStatus | None, artifacts: list[Artifact]
     ) -> Task:
-        async with self.lock:
+        """Updates the task's status and adds artifacts. A None status is left as is."""
+        if status is None and artifacts is None:
+            raise ValueError("Either status or artifacts must be given")
+
+        async with self.task_lock(task_id):
             try:
-                task = self.tasks[task_id]
-            except KeyError:
+                if status is not None:
+                    task = await self.task_store.update_status(task_id, status)
+                    if status.message is not None:
+                        task = await self.task_store.append_history(task_id, [status.message])
+
+                if artifacts is not None:
+                    task = await self.task_store.append_artifacts(task_id, artifacts)
+            except ValueError:
                 logger.error(f"Task {task_id} not found for updating the task")
-                raise ValueError(f"Task {task_id} not found")
-
-            task.status = status
+                raise
 
-            if status.message is not None:
-                task.history.append(status.message)
-
-            if artifacts is not None:
-                if task.artifacts is None:
-                    task.artifacts = []
-                task.artifacts.extend(artifacts)
+            if self.retention_policy is not None and status is not None:
+                if status.state in TERMINAL_STATES:
+                    self.terminal_tasks.record(task_id, len(task.model_dump_json()))
+                else:
+                    self.terminal_tasks.discard(task_id)
 
             return task
 
+    async def evict_task(self, task_id: str):
+        """Removes a task with its push notification config and subscribers."""
+        async with self.task_lock(task_id):
+            await self.task_store.delete(task_id)
+            self.terminal_tasks.discard(task_id)
+
+        async with self.subscriber_lock(task_id):
+            self.task_sse_subscribers.pop(task_id, None)
+            self.task_event_journals.pop(task_id, None)
+            self._cancel_journal_expiry(task_id)
+
+        self.evicted_task_count += 1
+
+    async def evict_tasks(self) -> list[str]:
+        """Evicts the terminal tasks that exceed the retention policy."""
+        if self.retention_policy is None:
+            return []
+
+        resident_tasks = await self.task_store.count()
+        task_ids = self.terminal_tasks.select_evictions(
+            self.retention_policy, resident_tasks
+        )
+        for task_id in task_ids:
+            await self.evict_task(task_id)
+
+        if task_ids:
+            logger.info(f"Evicted {len(task_ids)} terminal tasks")
+        return task_ids
+
+    async def get_retention_stats(self) -> dict[str, int]:
+        return {
+            "resident_tasks": await self.task_store.count(),
+            "terminal_tasks": len(self.terminal_tasks.tasks),
+            "terminal_bytes": self.terminal_tasks.total_bytes,
+            "evicted_tasks": self.evicted_task_count,
+        }
+
+    def _ensure_retention_sweeper(self):
+        if self.retention_policy is None or self._retention_sweeper is not None:
+            return
+
+        self._retention_sweeper = asyncio.create_task(self._sweep_tasks())
+
+    async def load_terminal_tasks(self):
+        """Tracks the terminal tasks already in the store, e.g. after a restart."""
+        now = time.time()
+        stored = [
+            info
+            for info in await self.task_store.list_by_state(TERMINAL_STATES)
+            if info.id not in self.terminal_tasks.tasks
+        ]
+        # Stored tasks are older than any tracked since startup, so they go
+        # first in eviction order, the least recently updated at the front.
+        for info in reversed(stored):
+            self.terminal_tasks.record(info.id, info.size, max(now - info.updated_at, 0.0))
+            self.terminal_tasks.tasks.move_to_end(info.id, last=False)
+        if stored:
+            logger.info(f"Tracking {len(stored)} terminal tasks found in the task store")
+
+    async def _sweep_tasks(self):
+        try:
+            await self.load_terminal_tasks()
+        except Exception as e:
+            logger.error(f"Error while loading terminal tasks: {e}")
+        while True:
+            await asyncio.sleep(self.retention_policy.sweep_interval)
+            try:
+                await self.evict_tasks()
+            except Exception as e:
+                logger.error(f"Error while evicting tasks: {e}")
+
     def append_task_history(self, task: Task, historyLength: int | None):
         new_task = task.model_copy()
         if historyLength is not None and historyLength > 0:
@@ -236,42 +477,98 @@ class InMemoryTaskManager(TaskManager):
 
         return new_task        
 
-    async def setup_sse_consumer(self, task_id: str, is_resubscribe: bool = False):
-        async with self.subscriber_lock:
-            if task_id not in self.task_sse_subscribers:
+    async def setup_sse_consumer(
+        self,
+        task_id: str,
+        is_resubscribe: bool = False,
+        last_event_id: int | None = None,
+    ):
+        """Registers a new SSE subscriber queue for the task.
+
+        For a resubscription the journaled events after `last_event_id` are
+        queued first, so the subscriber sees them before any live event.
+        """
+        async with self.subscriber_lock(task_id):
+            journal = self.task_event_journals.get(task_id)
+            if journal is None:
                 if is_resubscribe:
                     raise ValueError("Task not found for resubscription")
                 else:
+                    journal = TaskEventJournal(self.event_journal_size)
+                    self.task_event_journals[task_id] = journal
                     self.task_sse_subscribers[task_id] = []
 
-            sse_event_queue = asyncio.Queue(maxsize=0) # <=0 is unlimited
+            sse_event_queue = SSESubscriber(self.sse_queue_size, self.slow_consumer_policy)
+            if is_resubscribe:
+                if journal.is_missing_events(last_event_id):
+                    logger.warning(
+                        f"Events after {last_event_id} for task {task_id} are no longer journaled"
+                    )
+                sse_event_queue.preload(journal.replay(last_event_id))
+            else:
+                journal.closed = False
+                self._cancel_journal_expiry(task_id)
+
             self.task_sse_subscribers[task_id].append(sse_event_queue)
             return sse_event_queue
 
     async def enqueue_events_for_sse(self, task_id, task_update_event):
-        async with self.subscriber_lock:
-            if task_id not in self.task_sse_subscribers:
+        async with self.subscriber_lock(task_id):
+            journal = self.task_event_journals.get(task_id)
+            if journal is None:
                 return
 
-            current_subscribers = self.task_sse_subscribers[task_id]
-            for subscriber in current_subscribers:
-                await subscriber.put(task_update_event)
+            entry = journal.append(task_update_event)
+            for subscriber in self.task_sse_subscribers[task_id]:
+                was_connected = not subscriber.disconnected
+                if not subscriber.offer(entry) and was_connected:
+                    logger.warning(f"Disconnecting slow SSE subscriber of task {task_id}")
+
+            if journal.closed:
+                self._cancel_journal_expiry(task_id)
+                self._journal_expiries[task_id] = asyncio.get_running_loop().call_later(
+                    self.event_journal_ttl, self._expire_journal, task_id, journal
+                )
+
+    def _cancel_journal_expiry(self, task_id: str):
+        expiry = self._journal_expiries.pop(task_id, None)
+        if expiry is not None:
+            expiry.cancel()
+
+    def _expire_journal(self, task_id: str, journal: TaskEventJournal):
+        # Runs on the event loop between awaits, so no subscriber lock holder
+        # can be halfway through using the journal.
+        self._journal_expiries.pop(task_id, None)
+        if self.task_event_journals.get(task_id) is not journal or not journal.closed:
+            return
+        del self.task_event_journals[task_id]
+        if not self.task_sse_subscribers.get(task_id):
+            self.task_sse_subscribers.pop(task_id, None)
 
     async def dequeue_events_for_sse(
-        self, request_id, task_id, sse_event_queue: asyncio.Queue
-    ) -> AsyncIterable[SendTaskStreamingResponse] | JSONRPCResponse:
+        self, request_id, task_id, sse_event_queue: SSESubscriber
+    ) -> AsyncIterable[TaskStreamEvent] | JSONRPCResponse:
+        response_prefix = streaming_response_prefix(request_id)
+        last_event_id = 0
         try:
             while True:                
-                event = await sse_event_queue.get()
-                if isinstance(event, JSONRPCError):
-                    yield SendTaskStreamingResponse(id=request_id, error=event)
+                entry: JournaledEvent | None = await sse_event_queue.get()
+                if entry is None:
+                    error = SendTaskStreamingResponse(
+                        id=request_id, error=SlowSubscriberError()
+                    )
+                    yield TaskStreamEvent(last_event_id, encode_model(error))
                     break
-                                                
-                yield SendTaskStreamingResponse(id=request_id, result=event)
-                if isinstance(event, TaskStatusUpdateEvent) and event.final:
+
+                last_event_id = entry.id
+                yield TaskStreamEvent(entry.id, entry.encode_response(response_prefix))
+                if is_final_event(entry.event):
                     break
         finally:
-            async with self.subscriber_lock:
-                if task_id in self.task_sse_subscribers:
-                    self.task_sse_subscribers[task_id].remove(sse_event_queue)
-
+            async with self.subscriber_lock(task_id):
+                subscribers = self.task_sse_subscribers.get(task_id)
+                if subscribers is not None:
+                    subscribers.remove(sse_event_queue)
+                    if not subscribers and task_id not in self.task_event_journals:
+                        # The journal already expired.
+                        del self.task_sse_subscribers[task_id]
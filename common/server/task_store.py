@@ -0,0 +1,360 @@
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, NamedTuple
+from common.types import (
+    Task,
+    TaskState,
+    TaskStatus,
+    Message,
+    Artifact,
+    PushNotificationConfig,
+    TextPart,
+)
+import asyncio
+import logging
+import sqlite3
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def merge_artifacts(existing: list[Artifact], artifacts: list[Artifact]) -> list[Artifact]:
+    """Adds artifacts to a task's artifacts, honoring streamed chunks.
+
+    An artifact with `append` set extends the latest artifact with the same
+    index, joining adjacent text parts. A non-append artifact replaces a
+    same-index artifact that is still being streamed (`lastChunk` is False)
+    and is added as a new artifact otherwise.
+    """
+    merged = list(existing)
+    for artifact in artifacts:
+        position = next(
+            (
+                i
+                for i in range(len(merged) - 1, -1, -1)
+                if merged[i].index == artifact.index
+            ),
+            None,
+        )
+        if artifact.append and position is not None:
+            current = merged[position]
+            parts = list(current.parts)
+            for part in artifact.parts:
+                if parts and isinstance(part, TextPart) and isinstance(parts[-1], TextPart):
+                    parts[-1] = TextPart(text=parts[-1].text + part.text)
+                else:
+                    parts.append(part)
+            merged[position] = current.model_copy(
+                update={"parts": parts, "lastChunk": artifact.lastChunk}
+            )
+        elif position is not None and merged[position].lastChunk is False:
+            merged[position] = artifact
+        else:
+            merged.append(artifact)
+    return merged
+
+
+class StoredTaskInfo(NamedTuple):
+    """The size and last update time (epoch seconds) of a stored task."""
+
+    id: str
+    size: int
+    updated_at: float
+
+
+class TaskStore(ABC):
+    """Persistence for tasks and their push notification configs.
+
+    Methods that modify an existing task raise ValueError when the task is
+    not found and return the updated task otherwise.
+    """
+
+    @abstractmethod
+    async def get(self, task_id: str) -> Task | None:
+        pass
+
+    @abstractmethod
+    async def upsert(self, task: Task) -> Task:
+        pass
+
+    @abstractmethod
+    async def update_status(self, task_id: str, status: TaskStatus) -> Task:
+        pass
+
+    @abstractmethod
+    async def append_history(self, task_id: str, messages: list[Message]) -> Task:
+        pass
+
+    @abstractmethod
+    async def append_artifacts(self, task_id: str, artifacts: list[Artifact]) -> Task:
+        pass
+
+    @abstractmethod
+    async def delete(self, task_id: str) -> None:
+        """Removes a task together with its push notification config."""
+        pass
+
+    @abstractmethod
+    async def list_by_session(self, session_id: str) -> list[Task]:
+        pass
+
+    @abstractmethod
+    async def count(self) -> int:
+        pass
+
+    @abstractmethod
+    async def list_by_state(self, states: set[TaskState]) -> list[StoredTaskInfo]:
+        """Lists the tasks in any of `states`, least recently updated first."""
+        pass
+
+    @abstractmethod
+    async def get_push_notification_config(
+        self, task_id: str
+    ) -> PushNotificationConfig | None:
+        pass
+
+    @abstractmethod
+    async def set_push_notification_config(
+        self, task_id: str, config: PushNotificationConfig
+    ) -> None:
+        pass
+
+    async def close(self):
+        """Releases the store's connections; the store is not used afterwards."""
+        pass
+
+
+class InMemoryTaskStore(TaskStore):
+    """Keeps tasks in process memory. Returned tasks are the stored objects."""
+
+    def __init__(self):
+        self.tasks: dict[str, Task] = {}
+        self.push_notification_infos: dict[str, PushNotificationConfig] = {}
+
+    async def get(self, task_id: str) -> Task | None:
+        return self.tasks.get(task_id)
+
+    async def upsert(self, task: Task) -> Task:
+        self.tasks[task.id] = task
+        return task
+
+    async def update_status(self, task_id: str, status: TaskStatus) -> Task:
+        task = self._get_existing(task_id)
+        task.status = status
+        return task
+
+    async def append_history(self, task_id: str, messages: list[Message]) -> Task:
+        task = self._get_existing(task_id)
+        if task.history is None:
+            task.history = []
+        task.history.extend(messages)
+        return task
+
+    async def append_artifacts(self, task_id: str, artifacts: list[Artifact]) -> Task:
+        task = self._get_existing(task_id)
+        task.artifacts = merge_artifacts(task.artifacts or [], artifacts)
+        return task
+
+    async def delete(self, task_id: str) -> None:
+        self.tasks.pop(task_id, None)
+        self.push_notification_infos.pop(task_id, None)
+
+    async def list_by_session(self, session_id: str) -> list[Task]:
+        return [task for task in self.tasks.values() if task.sessionId == session_id]
+
+    async def count(self) -> int:
+        return len(self.tasks)
+
+    async def list_by_state(self, states: set[TaskState]) -> list[StoredTaskInfo]:
+        # Update times are not kept in memory; the tasks are as new as the store.
+        now = time.time()
+        return [
+            StoredTaskInfo(task.id, len(task.model_dump_json()), now)
+            for task in self.tasks.values()
+            if task.status.state in states
+        ]
+
+    async def get_push_notification_config(
+        self, task_id: str
+    ) -> PushNotificationConfig | None:
+        return self.push_notification_infos.get(task_id)
+
+    async def set_push_notification_config(
+        self, task_id: str, config: PushNotificationConfig
+    ) -> None:
+        self.push_notification_infos[task_id] = config
+
+    def _get_existing(self, task_id: str) -> Task:
+        task = self.tasks.get(task_id)
+        if task is None:
+            raise ValueError(f"Task {task_id} not found")
+        return task
+
+
+class SqliteTaskStore(TaskStore):
+    """Keeps tasks in an SQLite database in WAL mode.
+
+    All database work runs on a single dedicated thread, so the event loop is
+    never blocked and the connection is never shared between threads. Tasks
+    are stored as JSON and indexed by task id and sessionId.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="sqlite-task-store"
+        )
+        self._conn: sqlite3.Connection | None = None
+
+    async def get(self, task_id: str) -> Task | None:
+        return await self._run(self._get, task_id)
+
+    async def upsert(self, task: Task) -> Task:
+        await self._run(self._write, task)
+        return task
+
+    async def update_status(self, task_id: str, status: TaskStatus) -> Task:
+        def update(task: Task):
+            task.status = status
+
+        return await self._run(self._modify, task_id, update)
+
+    async def append_history(self, task_id: str, messages: list[Message]) -> Task:
+        def update(task: Task):
+            task.history = (task.history or []) + messages
+
+        return await self._run(self._modify, task_id, update)
+
+    async def append_artifacts(self, task_id: str, artifacts: list[Artifact]) -> Task:
+        def update(task: Task):
+            task.artifacts = merge_artifacts(task.artifacts or [], artifacts)
+
+        return await self._run(self._modify, task_id, update)
+
+    async def delete(self, task_id: str) -> None:
+        def delete(conn: sqlite3.Connection):
+            with conn:
+                conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+                conn.execute(
+                    "DELETE FROM push_notification_configs WHERE task_id = ?",
+                    (task_id,),
+                )
+
+        await self._run(delete)
+
+    async def list_by_session(self, session_id: str) -> list[Task]:
+        def list_tasks(conn: sqlite3.Connection) -> list[Task]:
+            rows = conn.execute(
+                "SELECT data FROM tasks WHERE session_id = ? ORDER BY updated_at",
+                (session_id,),
+            ).fetchall()
+            return [Task.model_validate_json(row[0]) for row in rows]
+
+        return await self._run(list_tasks)
+
+    async def count(self) -> int:
+        def count(conn: sqlite3.Connection) -> int:
+            return conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+
+        return await self._run(count)
+
+    async def list_by_state(self, states: set[TaskState]) -> list[StoredTaskInfo]:
+        def list_tasks(conn: sqlite3.Connection) -> list[StoredTaskInfo]:
+            values = [state.value for state in states]
+            rows = conn.execute(
+                "SELECT id, length(data), updated_at FROM tasks "
+                f"WHERE state IN ({','.join('?' * len(values))}) ORDER BY updated_at",
+                values,
+            ).fetchall()
+            return [StoredTaskInfo(*row) for row in rows]
+
+        return await self._run(list_tasks)
+
+    async def get_push_notification_config(
+        self, task_id: str
+    ) -> PushNotificationConfig | None:
+        def get_config(conn: sqlite3.Connection) -> PushNotificationConfig | None:
+            row = conn.execute(
+                "SELECT data FROM push_notification_configs WHERE task_id = ?",
+                (task_id,),
+            ).fetchone()
+            return None if row is None else PushNotificationConfig.model_validate_json(row[0])
+
+        return await self._run(get_config)
+
+    async def set_push_notification_config(
+        self, task_id: str, config: PushNotificationConfig
+    ) -> None:
+        def set_config(conn: sqlite3.Connection):
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO push_notification_configs (task_id, data) "
+                    "VALUES (?, ?)",
+                    (task_id, config.model_dump_json(exclude_none=True)),
+                )
+
+        await self._run(set_config)
+
+    async def close(self):
+        def close(conn: sqlite3.Connection):
+            conn.close()
+            self._conn = None
+
+        if self._conn is not None:
+            await self._run(close)
+        self._executor.shutdown(wait=False)
+
+    async def _run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, lambda: fn(self._connection(), *args)
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS tasks ("
+                    "id TEXT PRIMARY KEY, session_id TEXT, state TEXT, "
+                    "updated_at REAL NOT NULL, data TEXT NOT NULL)"
+                )
+                conn.execute(
+                    "CREATE INDEX IF NOT EXISTS tasks_session_id ON tasks (session_id)"
+                )
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS push_notification_configs ("
+                    "task_id TEXT PRIMARY KEY, data TEXT NOT NULL)"
+                )
+            self._conn = conn
+        return self._conn
+
+    def _get(self, conn: sqlite3.Connection, task_id: str) -> Task | None:
+        row = conn.execute("SELECT data FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        return None if row is None else Task.model_validate_json(row[0])
+
+    def _write(self, conn: sqlite3.Connection, task: Task):
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO tasks (id, session_id, state, updated_at, data) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    task.id,
+                    task.sessionId,
+                    task.status.state.value,
+                    time.time(),
+                    task.model_dump_json(),
+                ),
+            )
+
+    def _modify(
+        self, conn: sqlite3.Connection, task_id: str, update: Callable[[Task], None]
+    ) -> Task:
+        task = self._get(conn, task_id)
+        if task is None:
+            raise ValueError(f"Task {task_id} not found")
+        update(task)
+        self._write(conn, task)
+        return task
@@ -126,6 +126,10 @@ class TaskQueryParams(TaskIdParams):
     historyLength: int | None = None
 
 
+class TaskResubscriptionParams(TaskIdParams):
+    lastEventId: int | None = None
+
+
 class TaskSendParams(BaseModel):
     id: str
     sessionId: str = Field(default_factory=lambda: uuid4().hex)
@@ -221,7 +225,7 @@ class GetTaskPushNotificationResponse(JSONRPCResponse):
 
 class TaskResubscriptionRequest(JSONRPCRequest):
     method: Literal["tasks/resubscribe",] = "tasks/resubscribe"
-    params: TaskIdParams
+    params: TaskResubscriptionParams
 
 
 A2ARequest = TypeAdapter(
@@ -302,6 +306,18 @@ class ContentTypeNotSupportedError(JSONRPCError):
     data: None = None
 
 
+class ServerBusyError(JSONRPCError):
+    code: int = -32006
+    message: str = "Server is busy, try again later"
+    data: None = None
+
+
+class SlowSubscriberError(JSONRPCError):
+    code: int = -32007
+    message: str = "Subscriber is too slow, resubscribe with the last event id"
+    data: None = None
+
+
 class AgentProvider(BaseModel):
     organization: str
     url: str | None = None
@@ -359,6 +375,12 @@ class A2AClientJSONError(A2AClientError):
         super().__init__(f"JSON Error: {message}")
 
 
+class A2AClientCircuitOpenError(A2AClientError):
+    def __init__(self, message: str):
+        self.message = message
+        super().__init__(f"Circuit Open: {message}")
+
+
 class MissingAPIKeyError(Exception):
     """Exception for missing API key."""
 
@@ -1,5 +1,6 @@
 import sys
 import asyncio
+import concurrent.futures
 import functools
 import json
 import uuid
@@ -47,19 +48,29 @@ class HostAgent:
     self.task_callback = task_callback
     self.remote_agent_connections: dict[str, RemoteAgentConnections] = {}
     self.cards: dict[str, AgentCard] = {}
-    for address in remote_agent_addresses:
-      card_resolver = A2ACardResolver(address)
-      card = card_resolver.get_agent_card()
-      remote_connection = RemoteAgentConnections(card)
-      self.remote_agent_connections[card.name] = remote_connection
-      self.cards[card.name] = card
-    agent_info = []
-    for ra in self.list_remote_agents():
-      agent_info.append(json.dumps(ra))
-    self.agents = '\n'.join(agent_info)
+    self.agents = ''
+    # Replaced connections whose clients are still being closed.
+    self._closing: set[asyncio.Task] = set()
+    if remote_agent_addresses:
+      # Resolve all cards concurrently, in about one round trip.
+      for card in run_sync(A2ACardResolver.resolve_all(remote_agent_addresses)):
+        self.register_agent_card(card)
+
+  async def register_agent_addresses(self, remote_agent_addresses: List[str]):
+    """Resolves the cards of the agents at the given addresses and registers them."""
+    for card in await A2ACardResolver.resolve_all(remote_agent_addresses):
+      self.register_agent_card(card)
 
   def register_agent_card(self, card: AgentCard):
-    remote_connection = RemoteAgentConnections(card)
+    existing = self.remote_agent_connections.get(card.name)
+    if existing and existing.card.url == card.url:
+      # Keep the pooled connections to an agent that is registered again.
+      remote_connection = RemoteAgentConnections(card, existing.agent_client)
+    else:
+      remote_connection = RemoteAgentConnections(card)
+      if existing:
+        # The agent moved; release the pooled connections to its old URL.
+        self._close_connection(existing)
     self.remote_agent_connections[card.name] = remote_connection
     self.cards[card.name] = card
     agent_info = []
@@ -67,6 +78,23 @@ class HostAgent:
       agent_info.append(json.dumps(ra))
     self.agents = '\n'.join(agent_info)
 
+  def _close_connection(self, connection: RemoteAgentConnections):
+    try:
+      loop = asyncio.get_running_loop()
+    except RuntimeError:
+      run_sync(connection.close())
+      return
+    closing = loop.create_task(connection.close())
+    self._closing.add(closing)
+    closing.add_done_callback(self._closing.discard)
+
+  def get_remote_agent_stats(self) -> dict[str, dict]:
+    """Returns the latency and error stats of the calls to each remote agent."""
+    return {
+        name: connection.get_stats()
+        for name, connection in self.remote_agent_connections.items()
+    }
+
   def create_agent(self) -> Agent:
     return Agent(
         model="gemini-2.0-flash-001",
@@ -217,6 +245,17 @@ Current agent: {current_agent['active_agent']}
         response.extend(convert_parts(artifact.parts, tool_context))
     return response
 
+def run_sync(coroutine):
+  """Runs a coroutine to completion from synchronous code."""
+  try:
+    asyncio.get_running_loop()
+  except RuntimeError:
+    return asyncio.run(coroutine)
+  # An event loop is already running in this thread; use another one.
+  with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+    return executor.submit(asyncio.run, coroutine).result()
+
+
 def convert_parts(parts: list[Part], tool_context: ToolContext):
   rval = []
   for p in parts:
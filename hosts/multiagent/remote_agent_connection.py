@@ -9,7 +9,7 @@ from common.types import (
     TaskStatus,
     TaskState,
 )
-from common.client import A2AClient
+from common.client import A2AClient, CircuitBreaker, RetryPolicy
 
 TaskCallbackArg = Task | TaskStatusUpdateEvent | TaskArtifactUpdateEvent
 TaskUpdateCallback = Callable[[TaskCallbackArg], Task]
@@ -17,8 +17,14 @@ TaskUpdateCallback = Callable[[TaskCallbackArg], Task]
 class RemoteAgentConnections:
   """A class to hold the connections to the remote agents."""
 
-  def __init__(self, agent_card: AgentCard):
-    self.agent_client = A2AClient(agent_card)
+  def __init__(self, agent_card: AgentCard, agent_client: A2AClient | None = None):
+    # The client keeps a connection pool to the agent; reuse it across tasks.
+    # By default task lookups are retried and an unhealthy agent fails fast.
+    self.agent_client = agent_client or A2AClient(
+        agent_card,
+        retry_policy=RetryPolicy(),
+        circuit_breaker=CircuitBreaker(),
+    )
     self.card = agent_card
 
     self.conversation_name = None
@@ -28,6 +34,12 @@ class RemoteAgentConnections:
   def get_agent(self) -> AgentCard:
     return self.card
 
+  def get_stats(self) -> dict:
+    return self.agent_client.get_stats()
+
+  async def close(self):
+    await self.agent_client.aclose()
+
   async def send_task(
       self,
       request: TaskSendParams,
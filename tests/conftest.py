@@ -0,0 +1,38 @@
+from agents.langgraph.agent import CurrencyAgent
+from agents.langgraph.models import create_chat_model
+from agents.langgraph.task_manager import AgentTaskManager
+from common.server import A2AServer
+from common.server.scheduler import ExecutionScheduler
+from common.types import AgentCapabilities, AgentCard
+from common.utils.push_notification_auth import PushNotificationSenderAuth
+import pytest
+
+
+@pytest.fixture
+def create_server():
+    """Builds an A2A server around a CurrencyAgent on the scripted model."""
+
+    def create(
+        stream_tokens: bool = False,
+        scheduler: ExecutionScheduler | None = None,
+        **model_options,
+    ) -> A2AServer:
+        agent_card = AgentCard(
+            name="Currency Agent",
+            url="http://testserver/",
+            version="1.0.0",
+            capabilities=AgentCapabilities(streaming=True),
+            skills=[],
+        )
+        agent = CurrencyAgent(
+            model=create_chat_model("fake", **model_options),
+            stream_tokens=stream_tokens,
+        )
+        return A2AServer(
+            agent_card=agent_card,
+            task_manager=AgentTaskManager(
+                agent, PushNotificationSenderAuth(), scheduler=scheduler
+            ),
+        )
+
+    return create
@@ -0,0 +1,54 @@
+from common.client import A2AClient
+import asyncio
+import httpx
+import time
+
+
+def send_params(task_id: str) -> dict:
+    return {
+        "id": task_id,
+        "sessionId": f"session-{task_id}",
+        "message": {"role": "user", "parts": [{"type": "text", "text": "What is 2 * 3?"}]},
+    }
+
+
+def test_get_task_latency_stays_flat_during_agent_runs(create_server):
+    server = create_server(latency=0.5, tokens_per_second=0)
+
+    async def measure_get_task(client: A2AClient, samples: int) -> list[float]:
+        latencies = []
+        for _ in range(samples):
+            started = time.perf_counter()
+            response = await client.get_task({"id": "probe"})
+            latencies.append(time.perf_counter() - started)
+            assert response.result is not None
+            await asyncio.sleep(0.02)
+        return latencies
+
+    async def main():
+        transport = httpx.ASGITransport(app=server.app)
+        async with A2AClient(
+            url="http://testserver/",
+            httpx_client=httpx.AsyncClient(transport=transport),
+        ) as client:
+            await client.send_task(send_params("probe"))
+            idle = await measure_get_task(client, 10)
+
+            # Each run makes several model calls, keeping the agent busy for
+            # well over a second while tasks/get is measured.
+            runs = [
+                asyncio.create_task(client.send_task(send_params(f"run-{i}")))
+                for i in range(10)
+            ]
+            await asyncio.sleep(0.1)
+            busy = await measure_get_task(client, 20)
+            assert not any(run.done() for run in runs)
+
+            responses = await asyncio.gather(*runs)
+            assert all(r.result.status.state == "completed" for r in responses)
+            return idle, busy
+
+    idle, busy = asyncio.run(main())
+    # A blocking agent would hold tasks/get for a whole model call (0.5s).
+    assert max(busy) < 0.1
+    assert sorted(busy)[len(busy) // 2] < max(idle) + 0.05
@@ -0,0 +1,41 @@
+from agents.langgraph.agent import CurrencyAgent
+from agents.langgraph.models import create_chat_model
+import asyncio
+import pytest
+
+pytest.importorskip("aiosqlite")
+pytest.importorskip("langgraph.checkpoint.sqlite")
+
+from agents.langgraph.checkpoints import SqliteCheckpointStore  # noqa: E402
+
+
+def create_agent(path) -> CurrencyAgent:
+    # Built outside any event loop, as the server's command line does.
+    return CurrencyAgent(
+        model=create_chat_model("fake", latency=0, tokens_per_second=0),
+        checkpoints=SqliteCheckpointStore(str(path)),
+    )
+
+
+def test_sqlite_sessions_survive_a_restart(tmp_path):
+    path = tmp_path / "checkpoints.db"
+
+    async def first_run():
+        agent = create_agent(path)
+        response = await agent.invoke("What is 2 * 3?", "session-1")
+        await agent.close()
+        return response
+
+    async def second_run():
+        agent = create_agent(path)
+        await agent.open()
+        state = await agent.graph.aget_state(agent._get_config("session-1"))
+        await agent.close()
+        return state.values.get("messages", [])
+
+    response = asyncio.run(first_run())
+    assert response["is_task_complete"]
+
+    messages = asyncio.run(second_run())
+    assert messages[0].content == "What is 2 * 3?"
+    assert messages[-1].content == response["content"]
@@ -0,0 +1,120 @@
+from common.client import A2AClient
+from common.types import TaskArtifactUpdateEvent, TaskStatusUpdateEvent
+import asyncio
+import httpx
+import pytest
+import time
+
+
+def test_concurrent_streams(create_server):
+    server = create_server(stream_tokens=True, latency=0.2, tokens_per_second=50)
+
+    async def stream_task(client: A2AClient, task_id: str) -> list:
+        payload = {
+            "id": task_id,
+            "sessionId": f"session-{task_id}",
+            "message": {"role": "user", "parts": [{"type": "text", "text": "What is 2 * 3?"}]},
+        }
+        return [response async for response in client.send_task_streaming(payload)]
+
+    async def main():
+        transport = httpx.ASGITransport(app=server.app)
+        async with A2AClient(
+            url="http://testserver/",
+            httpx_client=httpx.AsyncClient(transport=transport),
+        ) as client:
+            started = time.perf_counter()
+            single = await stream_task(client, "single")
+            single_time = time.perf_counter() - started
+
+            started = time.perf_counter()
+            streams = await asyncio.gather(
+                *(stream_task(client, f"task-{i}") for i in range(100))
+            )
+            return single, single_time, streams, time.perf_counter() - started
+
+    single, single_time, streams, elapsed = asyncio.run(main())
+
+    assert len(streams) == 100
+    for responses in streams:
+        assert [r.error for r in responses if r.error] == []
+        assert any(isinstance(r.result, TaskArtifactUpdateEvent) for r in responses)
+        final = responses[-1].result
+        assert isinstance(final, TaskStatusUpdateEvent) and final.final
+        assert final.status.state == "completed"
+        assert len(responses) == len(single)
+    # The streams share one event loop and connection pool; run serially
+    # they would take 100 times as long as a single stream.
+    assert elapsed < single_time * 10
+
+
+class DroppingTransport(httpx.AsyncBaseTransport):
+    """Cuts the first tasks/sendSubscribe stream after `keep_events` events."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, keep_events: int):
+        self.transport = transport
+        self.keep_events = keep_events
+        self.dropped = False
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await self.transport.handle_async_request(request)
+        if self.dropped or b"tasks/sendSubscribe" not in request.content:
+            return response
+        self.dropped = True
+
+        body = b"".join([chunk async for chunk in response.stream])
+        events = body.replace(b"\r\n", b"\n").split(b"\n\n")[: self.keep_events]
+
+        class Truncated(httpx.AsyncByteStream):
+            async def __aiter__(stream):
+                for event in events:
+                    yield event + b"\n\n"
+                raise httpx.ReadError("connection lost")
+
+        return httpx.Response(
+            response.status_code, headers=response.headers, stream=Truncated()
+        )
+
+
+def describe(response) -> tuple:
+    result = response.result
+    if isinstance(result, TaskArtifactUpdateEvent):
+        return "artifact", result.artifact.parts[0].text, result.artifact.append
+    return "status", result.status.state, result.final
+
+
+@pytest.mark.parametrize("keep_events", [0, 2])
+def test_resumed_stream_has_no_gaps_or_duplicates(create_server, keep_events):
+    server = create_server(stream_tokens=True, latency=0, tokens_per_second=1000)
+
+    def payload(task_id: str) -> dict:
+        return {
+            "id": task_id,
+            "sessionId": f"session-{task_id}",
+            "message": {"role": "user", "parts": [{"type": "text", "text": "What is 2 * 3?"}]},
+        }
+
+    async def main():
+        transport = httpx.ASGITransport(app=server.app)
+        async with A2AClient(
+            url="http://testserver/",
+            httpx_client=httpx.AsyncClient(transport=transport),
+        ) as client:
+            expected = [r async for r in client.send_task_streaming(payload("intact"))]
+
+        dropping = DroppingTransport(transport, keep_events)
+        async with A2AClient(
+            url="http://testserver/",
+            httpx_client=httpx.AsyncClient(transport=dropping),
+        ) as client:
+            resumed = [
+                r
+                async for r in client.send_task_streaming(
+                    payload("dropped"), resume=True, resume_backoff=0.01
+                )
+            ]
+        assert dropping.dropped
+        return expected, resumed
+
+    expected, resumed = asyncio.run(main())
+    assert [describe(r) for r in resumed] == [describe(r) for r in expected]
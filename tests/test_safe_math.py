@@ -0,0 +1,48 @@
+from agents.langgraph.safe_math import EvaluationError, SafeMathEvaluator
+import pytest
+import time
+
+
+@pytest.mark.parametrize(
+    "expression, expected",
+    [
+        ("2 + 3", 5),
+        ("5 * 4 - 1", 19),
+        ("7 / 2", 3.5),
+        ("7 // 2", 3),
+        ("-(2 ** 10)", -1024),
+        ("1.5 * (2 + 2)", 6.0),
+    ],
+)
+def test_evaluates_arithmetic(expression, expected):
+    assert SafeMathEvaluator().evaluate(expression) == expected
+
+
+@pytest.mark.parametrize(
+    "expression, message",
+    [
+        ("1" * 201, "longer than 200"),
+        ("2 ** 1001", "Exponent is larger"),
+        ("10 ** 101", "too large"),
+        ("9 ** 9 ** 9", "Exponent is larger"),
+        ("1" * 101 + " + 1", "too large"),
+        ("(-8) ** 0.5", "not a real number"),
+        ("1 / 0", "Division by zero"),
+        ("__import__('os').system('true')", "Unsupported expression"),
+        ("[1] * 10 ** 9", "Unsupported expression"),
+        ("'a' * 10 ** 9", "Unsupported expression"),
+        ("2 +", "Invalid expression syntax"),
+    ],
+)
+def test_rejects_unsafe_or_oversized_expressions(expression, message):
+    with pytest.raises(EvaluationError, match=message):
+        SafeMathEvaluator().evaluate(expression)
+
+
+def test_bounds_evaluation_time():
+    evaluator = SafeMathEvaluator(max_length=10_000, max_seconds=1e-6)
+    expression = " + ".join(["1"] * 300)
+    started = time.perf_counter()
+    with pytest.raises(EvaluationError, match="took too long"):
+        evaluator.evaluate(expression)
+    assert time.perf_counter() - started < 1
@@ -0,0 +1,111 @@
+from common.client import A2AClient
+from common.server.scheduler import ExecutionScheduler
+from common.types import ServerBusyError, TaskState
+import asyncio
+import httpx
+
+
+def send_params(task_id: str) -> dict:
+    return {
+        "id": task_id,
+        "sessionId": f"session-{task_id}",
+        "message": {"role": "user", "parts": [{"type": "text", "text": "What is 2 * 3?"}]},
+    }
+
+
+def connect(server) -> A2AClient:
+    transport = httpx.ASGITransport(app=server.app)
+    return A2AClient(
+        url="http://testserver/", httpx_client=httpx.AsyncClient(transport=transport)
+    )
+
+
+def test_batch_errors_are_isolated_per_request(create_server):
+    server = create_server(latency=0, tokens_per_second=0)
+
+    async def main():
+        async with connect(server) as client:
+            await client.send_task(send_params("done"))
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport) as http_client:
+            return await http_client.post(
+                "http://testserver/",
+                json=[
+                    {"jsonrpc": "2.0", "id": 1, "method": "tasks/get", "params": {"id": "done"}},
+                    {"jsonrpc": "2.0", "id": 2, "method": "tasks/get", "params": {"id": "missing"}},
+                    {"jsonrpc": "2.0", "id": 3, "method": "tasks/get", "params": {}},
+                    {"jsonrpc": "2.0", "id": 4, "method": "tasks/unknown", "params": {}},
+                    {"jsonrpc": "2.0", "id": 5, "method": "tasks/sendSubscribe", "params": send_params("s")},
+                    "not a request",
+                ],
+            )
+
+    response = asyncio.run(main())
+    assert response.status_code == 200
+    body = response.json()
+    assert [item.get("id") for item in body] == [1, 2, 3, 4, 5, None]
+    assert body[0]["result"]["status"]["state"] == "completed"
+    assert [item["error"]["code"] for item in body[1:]] == [
+        -32001,  # task not found
+        -32600,  # invalid params
+        -32601,  # method not found
+        -32600,  # streaming is not allowed in a batch
+        -32600,  # not a request object
+    ]
+
+
+def test_full_queue_is_rejected_with_server_busy(create_server):
+    scheduler = ExecutionScheduler(max_concurrency=1, max_queue_size=1)
+    server = create_server(scheduler=scheduler, latency=0.3, tokens_per_second=0)
+
+    async def main():
+        async with connect(server) as client:
+            running = asyncio.create_task(client.send_task(send_params("running")))
+            await asyncio.sleep(0.05)
+            queued = asyncio.create_task(client.send_task(send_params("queued")))
+            await asyncio.sleep(0.05)
+            rejected = await client.send_task(send_params("rejected"))
+            assert not running.done() and not queued.done()
+            return rejected, await running, await queued
+
+    rejected, running, queued = asyncio.run(main())
+    assert rejected.error.code == ServerBusyError().code
+    assert running.result.status.state == TaskState.COMPLETED
+    assert queued.result.status.state == TaskState.COMPLETED
+    stats = scheduler.stats()
+    assert stats["rejected"] == 1 and stats["running"] == 0 and stats["queued"] == 0
+
+
+def test_cancel_moves_running_and_queued_tasks_to_canceled(create_server):
+    scheduler = ExecutionScheduler(max_concurrency=1, max_queue_size=1)
+    server = create_server(scheduler=scheduler, latency=0.3, tokens_per_second=0)
+
+    async def main():
+        async with connect(server) as client:
+            running = asyncio.create_task(client.send_task(send_params("running")))
+            await asyncio.sleep(0.05)
+            queued = asyncio.create_task(client.send_task(send_params("queued")))
+            await asyncio.sleep(0.05)
+
+            canceled = [
+                await client.cancel_task({"id": "queued"}),
+                await client.cancel_task({"id": "running"}),
+            ]
+            sent = [await queued, await running]
+            stored = [
+                (await client.get_task({"id": task_id})).result
+                for task_id in ("queued", "running")
+            ]
+            # The canceled executions gave their slots back.
+            after = await client.send_task(send_params("after"))
+            again = await client.cancel_task({"id": "after"})
+            return canceled, sent, stored, after, again
+
+    canceled, sent, stored, after, again = asyncio.run(main())
+    for response in canceled + sent:
+        assert response.result.status.state == TaskState.CANCELED
+    assert [task.status.state for task in stored] == [TaskState.CANCELED] * 2
+    assert after.result.status.state == TaskState.COMPLETED
+    # A finished task cannot be canceled.
+    assert again.error.code == -32002
+    assert scheduler.stats()["running"] == 0